@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional, Tuple
 from datetime import datetime, date
 from pydantic import BaseModel
@@ -12,6 +13,10 @@ from app.models.scheduling_models import Schedule, ShiftAssignment, EmergencyLog
 
 router = APIRouter()
 
+# 상태를 갖지 않는 서비스이므로 요청마다 생성하지 않고 공유
+manual_editing_service = ManualEditingService()
+permission_service = PermissionService()
+
 # Pydantic 스키마들
 class ShiftChangeRequest(BaseModel):
     assignment_id: int
@@ -82,7 +87,6 @@ class ShiftAssignmentResponse(BaseModel):
 # 권한 검사 헬퍼 함수
 def check_user_permission(db: Session, action: str, user_id: int = 1, ward_id: int = None) -> dict:
     """임시 권한 검사 함수 (실제 환경에서는 JWT 토큰에서 user_id 추출)"""
-    permission_service = PermissionService()
     return permission_service.check_permission(db, user_id, action, ward_id)
 
 def require_permission(action: str):
@@ -112,7 +116,7 @@ def validate_shift_change(
 ):
     """근무 변경 전 유효성 검증"""
     try:
-        result = ManualEditingService().validate_shift_change(
+        result = manual_editing_service.validate_shift_change(
             db=db,
             assignment_id=request.assignment_id,
             new_employee_id=request.new_employee_id,
@@ -149,7 +153,7 @@ def apply_shift_change(
 ):
     """근무 변경 적용"""
     try:
-        result = ManualEditingService().apply_shift_change(
+        result = manual_editing_service.apply_shift_change(
             db=db,
             assignment_id=request.assignment_id,
             new_employee_id=request.new_employee_id,
@@ -192,7 +196,7 @@ def get_replacement_suggestions(
 ):
     """대체 근무자 추천"""
     try:
-        suggestions = ManualEditingService().get_replacement_suggestions(
+        suggestions = manual_editing_service.get_replacement_suggestions(
             db=db,
             assignment_id=assignment_id,
             emergency=emergency,
@@ -228,7 +232,7 @@ def emergency_reassignment(
 ):
     """응급 근무 재배치"""
     try:
-        result = ManualEditingService().emergency_reassignment(
+        result = manual_editing_service.emergency_reassignment(
             db=db,
             assignment_id=request.assignment_id,
             replacement_employee_id=request.replacement_employee_id,
@@ -269,7 +273,7 @@ def bulk_shift_swap(
 ):
     """일괄 근무 교환"""
     try:
-        result = ManualEditingService().bulk_shift_swap(
+        result = manual_editing_service.bulk_shift_swap(
             db=db,
             swap_pairs=request.swap_pairs,
             admin_id=request.admin_id,
@@ -328,7 +332,10 @@ def get_schedule_assignments(
 ):
     """스케줄의 근무 배정 조회"""
     try:
-        query = db.query(ShiftAssignment).filter(ShiftAssignment.schedule_id == schedule_id)
+        # 직원 → 사용자 이름까지 한 번의 JOIN으로 함께 로드
+        query = db.query(ShiftAssignment).options(
+            joinedload(ShiftAssignment.employee).joinedload(Employee.user)
+        ).filter(ShiftAssignment.schedule_id == schedule_id)
         
         if employee_id:
             query = query.filter(ShiftAssignment.employee_id == employee_id)
@@ -347,7 +354,7 @@ def get_schedule_assignments(
         # 직원 이름 추가
         result = []
         for assignment in assignments:
-            employee = db.query(Employee).filter(Employee.id == assignment.employee_id).first()
+            employee = assignment.employee
             employee_name = employee.user.full_name if employee and employee.user else "Unknown"
             
             result.append(ShiftAssignmentResponse(
@@ -463,7 +470,7 @@ def get_schedule_score(
         
         if recalculate:
             # 점수 재계산
-            new_score = ManualEditingService()._recalculate_schedule_score(db, schedule_id)
+            new_score = manual_editing_service._recalculate_schedule_score(db, schedule_id)
             
             # 스케줄 업데이트
             schedule.optimization_score = new_score
@@ -557,13 +564,15 @@ def create_shift_assignment(
 ):
     """새 근무 배정 생성"""
     try:
-        # 중복 확인
-        existing = db.query(ShiftAssignment).filter(
+        shift_datetime = datetime.combine(shift_date, datetime.min.time())
+
+        # 중복 확인 (존재 여부만 확인)
+        existing = db.query(exists().where(
             ShiftAssignment.schedule_id == schedule_id,
             ShiftAssignment.employee_id == employee_id,
-            ShiftAssignment.shift_date == shift_date,
+            ShiftAssignment.shift_date == shift_datetime,
             ShiftAssignment.shift_type == shift_type
-        ).first()
+        )).scalar()
         
         if existing:
             raise HTTPException(
@@ -574,7 +583,7 @@ def create_shift_assignment(
         new_assignment = ShiftAssignment(
             schedule_id=schedule_id,
             employee_id=employee_id,
-            shift_date=datetime.combine(shift_date, datetime.min.time()),
+            shift_date=shift_datetime,
             shift_type=shift_type,
             is_manual_assignment=True,
             is_override=override,
@@ -650,7 +659,6 @@ def get_current_user_permissions(
         # 실제 환경에서는 JWT 토큰에서 user_id 추출
         user_id = 1  # 임시로 관리자 ID 사용
         
-        permission_service = PermissionService()
         permissions = permission_service.create_permission_summary(db, user_id)
         
         if 'error' in permissions:
@@ -679,7 +687,6 @@ def get_available_actions(
         # 실제 환경에서는 JWT 토큰에서 user_id 추출
         user_id = 1  # 임시로 관리자 ID 사용
         
-        permission_service = PermissionService()
         actions = permission_service.get_available_actions(db, user_id, ward_id)
         
         return {
@@ -5,7 +5,7 @@ from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from app.database import get_db
 from app.models.notification_models import (
@@ -125,7 +125,6 @@ async def create_notification(
     
     expires_at = None
     if notification_data.expires_hours:
-        from datetime import timedelta
         expires_at = datetime.utcnow() + timedelta(hours=notification_data.expires_hours)
     
     notification = notification_service.create_notification(
@@ -213,17 +212,27 @@ async def get_my_notifications(
     unread_only: bool = Query(False, description="읽지 않은 알림만 조회"),
     limit: int = Query(50, ge=1, le=100, description="조회할 알림 수"),
     offset: int = Query(0, ge=0, description="건너뛸 알림 수"),
+    cursor_created_at: Optional[datetime] = Query(None, description="이전 페이지 마지막 알림의 생성시각"),
+    cursor_id: Optional[int] = Query(None, description="이전 페이지 마지막 알림 ID"),
     db: Session = Depends(get_db),
     current_user_id: int = Depends(get_current_user_id),
     notification_service: NotificationService = Depends(get_notification_service)
 ):
     """내 알림 목록 조회"""
+    # 커서는 생성시각과 ID가 함께 있어야 유효 (하나만 오면 OFFSET으로 조용히 넘어가지 않도록 거부)
+    if (cursor_created_at is None) != (cursor_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="cursor_created_at과 cursor_id는 함께 지정해야 합니다"
+        )
+
     notifications = notification_service.get_user_notifications(
         db=db,
         user_id=current_user_id,
         unread_only=unread_only,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=(cursor_created_at, cursor_id) if cursor_created_at is not None else None
     )
     
     return notifications
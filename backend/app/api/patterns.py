@@ -218,8 +218,8 @@ def validate_employee_pattern(
             db=db,
             employee_id=request.employee_id,
             assignments=request.assignments,
-            period_start=datetime.combine(request.period_start, datetime.min.time()),
-            period_end=datetime.combine(request.period_end, datetime.min.time())
+            period_start=request.period_start,
+            period_end=request.period_end
         )
         
         return result
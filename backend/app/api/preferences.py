@@ -8,6 +8,7 @@ from pydantic import BaseModel
 from datetime import datetime, date
 from app.database.connection import get_db
 from app.models.models import PreferenceTemplate, ShiftRequestV2, PreferenceScore, Employee
+from app.models.scheduling_models import Schedule
 from app.services.preference_service import PreferenceService
 
 router = APIRouter()
@@ -288,8 +289,6 @@ async def get_fairness_analysis(
     db: Session = Depends(get_db)
 ):
     """스케줄 공정성 분석"""
-    from app.models.scheduling_models import Schedule
-    
     schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
     if not schedule:
         raise HTTPException(
@@ -397,8 +396,8 @@ async def get_preference_dashboard(
         "preferences_set_count": preferences_set,
         "preferences_set_rate": (preferences_set / len(employees)) * 100 if employees else 0,
         "pending_requests": len(pending_requests),
-        "urgent_requests": len([r for r in pending_requests if r.priority == "urgent"]),
-        "medical_requests": len([r for r in pending_requests if r.medical_reason]),
+        "urgent_requests": sum(1 for r in pending_requests if r.priority == "urgent"),
+        "medical_requests": sum(1 for r in pending_requests if r.medical_reason),
         "monthly_stats": stats,
         "recent_requests": pending_requests[:5]  # 최근 5개만
     }
\ No newline at end of file
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
+from operator import itemgetter
+import heapq
 import json
 
 from ..database.connection import get_db
@@ -388,7 +390,6 @@ async def get_schedule_breakdown(
     }
 
     # 근무 요청사항 조회 (해당 기간)
-    from datetime import datetime
     start_date = datetime(schedule.year, schedule.month, 1)
     if schedule.month == 12:
         end_date = datetime(schedule.year + 1, 1, 1)
@@ -416,7 +417,6 @@ async def get_schedule_breakdown(
     # 스케줄 데이터 변환 (JSON에서 리스트로)
     schedule_data = schedule.schedule_data
     if isinstance(schedule_data, str):
-        import json
         schedule_data = json.loads(schedule_data)
     
     # 스케줄 데이터가 dictionary 형태인 경우 리스트로 변환
@@ -751,12 +751,17 @@ def generate_ai_recommendations(schedule_data, employees, date, shift, issue_typ
 
     available_employees = [emp for emp in employees if emp.id not in assigned_employees]
 
-    recommendations = []
+    # 가용 직원 전체를 점수화한 뒤 상위 5명만 추천 (점수 순)
+    scored = heapq.nlargest(
+        5,
+        ((calculate_employee_suitability_score(emp, shift, date, schedule_data), emp)
+         for emp in available_employees),
+        key=itemgetter(0)
+    )
 
-    for emp in available_employees[:5]:  # 상위 5명 추천
-        # 간단한 점수 계산
-        score = calculate_employee_suitability_score(emp, shift, date, schedule_data)
+    recommendations = []
 
+    for score, emp in scored:
         recommendation = {
             "employee_id": emp.id,
             "employee_name": emp.name,
@@ -772,8 +777,6 @@ def generate_ai_recommendations(schedule_data, employees, date, shift, issue_typ
         }
         recommendations.append(recommendation)
 
-    # 점수 순으로 정렬
-    recommendations.sort(key=lambda x: x["suitability_score"], reverse=True)
     return recommendations
 
 def generate_alternative_scenarios(schedule_data, employees, date, shift):
@@ -9,9 +9,20 @@ load_dotenv()
 # SQLite를 기본으로 사용 (개발환경)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./nurse_scheduler.db")
 
+# 서버형 DB는 연결 재사용을 위해 풀 크기를 명시 (SQLite는 기본 풀 사용)
+pool_options = {} if "sqlite" in DATABASE_URL else {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+}
+
 engine = create_engine(
     DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
+    query_cache_size=1200,  # 기본값 500은 ORM 조회문이 많으면 캐시 교체가 잦음
+    pool_pre_ping=True,  # 끊어진 연결을 체크아웃 시점에 감지
+    **pool_options
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
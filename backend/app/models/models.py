@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Float, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Float, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -321,6 +321,11 @@ class ShiftRequestV2(Base):
     employee = relationship("Employee")
     reviewer = relationship("User", foreign_keys=[reviewed_by])
 
+    __table_args__ = (
+        # 직원별 승인 요청 조회 (선호도 점수의 휴가/근무 요청 충족률)
+        Index("ix_shift_req_v2_emp_status_type", "employee_id", "status", "request_type"),
+    )
+
 class PreferenceScore(Base):
     __tablename__ = "preference_scores"
     
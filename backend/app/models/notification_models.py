@@ -1,12 +1,16 @@
 """
 알림 및 승인 워크플로우 관련 모델들
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 from enum import Enum
 from .models import Base
 
+# PostgreSQL에서는 파싱된 바이너리 형태(JSONB)로 저장, 그 외 DB는 JSON
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 # 알림 타입 열거형
 class NotificationType(str, Enum):
     EMERGENCY_REQUEST = "emergency_request"          # 응급 상황 요청
@@ -53,7 +57,7 @@ class Notification(Base):
     message = Column(Text, nullable=False)
     
     # 관련 데이터 (JSON 형태로 저장)
-    related_data = Column(JSON, nullable=True)  # 관련된 shift_id, schedule_id 등
+    related_data = Column(JSONType, nullable=True)  # 관련된 shift_id, schedule_id 등
     
     # 알림 상태
     is_read = Column(Boolean, default=False)
@@ -67,6 +71,11 @@ class Notification(Base):
     recipient = relationship("User", foreign_keys=[recipient_id])
     sender = relationship("User", foreign_keys=[sender_id])
 
+    __table_args__ = (
+        # 사용자별 (읽지 않은) 알림 목록 최신순 조회
+        Index("ix_notification_recipient_read_created", "recipient_id", "is_read", "created_at"),
+    )
+
 class ApprovalWorkflow(Base):
     """승인 워크플로우 모델"""
     __tablename__ = "approval_workflows"
@@ -84,7 +93,7 @@ class ApprovalWorkflow(Base):
     # 승인 내용
     title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
-    request_data = Column(JSON, nullable=False)  # 승인 요청 상세 데이터
+    request_data = Column(JSONType, nullable=False)  # 승인 요청 상세 데이터
     
     # 승인 상태
     status = Column(SQLEnum(ApprovalStatus), default=ApprovalStatus.PENDING)
@@ -105,6 +114,11 @@ class ApprovalWorkflow(Base):
     requester = relationship("User", foreign_keys=[requester_id])
     approver = relationship("User", foreign_keys=[approver_id])
 
+    __table_args__ = (
+        # 역할별 승인 대기 목록 (우선순위, 요청시각 순) 조회
+        Index("ix_approval_workflow_status_role_priority", "status", "required_role", "priority", "created_at"),
+    )
+
 class NotificationTemplate(Base):
     """알림 템플릿 모델"""
     __tablename__ = "notification_templates"
@@ -194,4 +208,9 @@ class EmergencyAlert(Base):
     ward = relationship("Ward")
     related_employee = relationship("Employee")
     acknowledged_user = relationship("User", foreign_keys=[acknowledged_by])
-    resolved_user = relationship("User", foreign_keys=[resolved_by])
\ No newline at end of file
+    resolved_user = relationship("User", foreign_keys=[resolved_by])
+
+    __table_args__ = (
+        # 병동/심각도별 활성 응급 알림 조회
+        Index("ix_emergency_alert_status_ward_severity", "status", "ward_id", "severity"),
+    )
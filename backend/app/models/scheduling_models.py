@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Float, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Float, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .models import Base
@@ -73,6 +73,15 @@ class ShiftAssignment(Base):
     override_admin = relationship("User", foreign_keys=[override_by])
     modifier = relationship("User", foreign_keys=[modified_by])
 
+    __table_args__ = (
+        # 직원별 기간 조회 (주간/월간 근무시간, 패턴 검증) 및 중복 배정 확인
+        Index("ix_shift_assignment_emp_date_type", "employee_id", "shift_date", "shift_type"),
+        # 스케줄 내 직원 배정 조회
+        Index("ix_shift_assignment_schedule_emp", "schedule_id", "employee_id"),
+        # 날짜/교대별 배정 인원 조회 (병동 커버리지, 같은 교대 근무자)
+        Index("ix_shift_assignment_date_type_emp", "shift_date", "shift_type", "employee_id"),
+    )
+
 class EmergencyLog(Base):
     __tablename__ = "emergency_logs"
     
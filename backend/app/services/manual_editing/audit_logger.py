@@ -25,7 +25,8 @@ class AuditLogger:
                    original_state: Dict[str, Any],
                    new_state: Dict[str, Any],
                    admin_id: Optional[int] = None,
-                   override_reason: Optional[str] = None) -> int:
+                   override_reason: Optional[str] = None,
+                   timestamp: Optional[datetime] = None) -> int:
         """변경 이력 로그 생성"""
         try:
             # 감사 로그 데이터 구성
@@ -36,7 +37,7 @@ class AuditLogger:
                 'new_state': new_state,
                 'admin_id': admin_id,
                 'override_reason': override_reason,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': (timestamp or datetime.utcnow()).isoformat(),
                 'ip_address': self._get_client_ip(),  # 구현 필요
                 'user_agent': self._get_user_agent()  # 구현 필요
             }
@@ -125,7 +126,8 @@ class AuditLogger:
             original_state=details.get('original_state', {}),
             new_state=details.get('new_state', {}),
             admin_id=admin_id,
-            override_reason=reason
+            override_reason=reason,
+            timestamp=datetime.utcnow()
         )
 
     def generate_audit_report(self, db: Session,
@@ -2,8 +2,9 @@
 변경 적용기
 Single Responsibility: 검증된 근무 변경을 실제로 적용하는 것만 담당
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Tuple
 from datetime import datetime
+from sqlalchemy import update, case
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -20,13 +21,18 @@ logger = logging.getLogger(__name__)
 class ChangeApplier:
     """근무 변경 적용기"""
 
-    def __init__(self):
-        self.validation_engine = ValidationEngine()
-        self.audit_logger = AuditLogger()
-        self.notification_manager = NotificationManager()
+    def __init__(self,
+                 validation_engine: Optional[ValidationEngine] = None,
+                 audit_logger: Optional[AuditLogger] = None,
+                 notification_manager: Optional[NotificationManager] = None):
+        # 파사드에서 생성한 컴포넌트를 공유 (단독 사용 시에만 새로 생성)
+        self.validation_engine = validation_engine or ValidationEngine()
+        self.audit_logger = audit_logger or AuditLogger()
+        self.notification_manager = notification_manager or NotificationManager()
 
     def apply_shift_change(self, db: Session, change_request: ChangeRequest) -> ChangeResult:
         """근무 변경 적용"""
+        now = datetime.utcnow()
         try:
             # 1. 검증 실행 (오버라이드가 아닌 경우)
             if not change_request.override:
@@ -57,11 +63,11 @@ class ChangeApplier:
                     'employee_id': current_assignment.employee_id,
                     'shift_type': current_assignment.shift_type,
                     'shift_date': current_assignment.shift_date.isoformat(),
-                    'ward_id': current_assignment.ward_id
+                    'schedule_id': current_assignment.schedule_id
                 }
 
                 # 3. 실제 변경 적용
-                changes_made = self._apply_changes(current_assignment, change_request)
+                changes_made = self._apply_changes(current_assignment, change_request, now)
 
                 if not changes_made:
                     return ChangeResult(
@@ -80,7 +86,8 @@ class ChangeApplier:
                     original_state=original_state,
                     new_state=self._get_current_state(current_assignment),
                     admin_id=change_request.admin_id,
-                    override_reason=change_request.override_reason if change_request.override else None
+                    override_reason=change_request.override_reason if change_request.override else None,
+                    timestamp=now
                 )
 
                 # 6. 알림 발송
@@ -115,7 +122,8 @@ class ChangeApplier:
                 message=f"시스템 오류로 인해 변경이 실패했습니다: {str(e)}"
             )
 
-    def _apply_changes(self, assignment: ShiftAssignment, change_request: ChangeRequest) -> bool:
+    def _apply_changes(self, assignment: ShiftAssignment, change_request: ChangeRequest,
+                       now: Optional[datetime] = None) -> bool:
         """실제 변경사항 적용"""
         changes_made = False
 
@@ -139,7 +147,8 @@ class ChangeApplier:
 
         # 변경 시간 업데이트
         if changes_made:
-            assignment.updated_at = datetime.now()
+            assignment.last_modified = now or datetime.utcnow()
+            assignment.modified_by = change_request.admin_id
 
         return changes_made
 
@@ -149,8 +158,8 @@ class ChangeApplier:
             'employee_id': assignment.employee_id,
             'shift_type': assignment.shift_type,
             'shift_date': assignment.shift_date.isoformat(),
-            'ward_id': assignment.ward_id,
-            'updated_at': assignment.updated_at.isoformat() if assignment.updated_at else None
+            'schedule_id': assignment.schedule_id,
+            'updated_at': assignment.last_modified.isoformat() if assignment.last_modified else None
         }
 
     def apply_emergency_override(self, db: Session, change_request: ChangeRequest) -> ChangeResult:
@@ -197,6 +206,135 @@ class ChangeApplier:
 
         return results
 
+    def bulk_swap_assignments(self, db: Session, swap_pairs: List[Tuple[int, int]],
+                              admin_id: int, validation_level: str = "standard") -> Dict[str, Any]:
+        """여러 근무 배정의 직원을 한 트랜잭션으로 교환"""
+        results = []
+        successful_swaps = 0
+
+        try:
+            # 교환 대상 배정을 한 번에 조회
+            ids = {assignment_id for pair in swap_pairs for assignment_id in pair}
+            rows = {
+                row.id: row for row in db.query(ShiftAssignment).filter(
+                    ShiftAssignment.id.in_(ids)
+                ).all()
+            }
+            now = datetime.utcnow()
+            new_employee_ids: Dict[int, int] = {}
+            # 단일 UPDATE 대기 중인 교환에 포함된 직원 (검증은 DB의 현재 배정 기준)
+            pending_employee_ids: Set[int] = set()
+
+            for id1, id2 in swap_pairs:
+                a1, a2 = rows.get(id1), rows.get(id2)
+                if not a1 or not a2:
+                    results.append({
+                        'pair': [id1, id2],
+                        'success': False,
+                        'message': "해당 근무 배정을 찾을 수 없습니다"
+                    })
+                    continue
+
+                if validation_level != "strict" and (
+                    id1 in new_employee_ids or id2 in new_employee_ids
+                    or a1.employee_id in pending_employee_ids
+                    or a2.employee_id in pending_employee_ids
+                ):
+                    # 앞선 교환과 겹치면 검증 대상과 실제 반영 값이 달라지므로 거부
+                    results.append({
+                        'pair': [id1, id2],
+                        'success': False,
+                        'message': "앞선 교환과 같은 근무 배정 또는 직원이 포함되어 함께 처리할 수 없습니다"
+                    })
+                    continue
+
+                if validation_level != "minimal":
+                    error = self._validate_swap(db, a1, a2, admin_id, validation_level)
+                    if error:
+                        results.append({'pair': [id1, id2], 'success': False, 'message': error})
+                        continue
+
+                if validation_level != "strict":
+                    # 교환 결과만 누적 후 단일 UPDATE로 반영
+                    new_employee_ids[id1], new_employee_ids[id2] = a2.employee_id, a1.employee_id
+                    pending_employee_ids.update((a1.employee_id, a2.employee_id))
+                else:
+                    # 쌍 단위 SAVEPOINT: 실패한 쌍만 되돌리고 나머지는 유지
+                    try:
+                        with db.begin_nested():
+                            a1.employee_id, a2.employee_id = a2.employee_id, a1.employee_id
+                            for assignment in (a1, a2):
+                                assignment.last_modified = now
+                                assignment.modified_by = admin_id
+                            db.flush()
+                    except SQLAlchemyError as e:
+                        logger.warning(f"근무 교환 실패: pair=({id1}, {id2}), error={str(e)}")
+                        results.append({
+                            'pair': [id1, id2],
+                            'success': False,
+                            'message': f"데이터베이스 오류로 인해 교환이 실패했습니다: {str(e)}"
+                        })
+                        continue
+
+                successful_swaps += 1
+                results.append({
+                    'pair': [id1, id2],
+                    'success': True,
+                    'message': "근무 교환이 적용되었습니다"
+                })
+
+            if new_employee_ids:
+                db.execute(
+                    update(ShiftAssignment)
+                    .where(ShiftAssignment.id.in_(new_employee_ids.keys()))
+                    .values(
+                        employee_id=case(new_employee_ids, value=ShiftAssignment.id),
+                        last_modified=now,
+                        modified_by=admin_id
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+
+            db.commit()
+
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"일괄 근무 교환 중 데이터베이스 오류 발생: {str(e)}")
+            return {
+                'success': False,
+                'total_pairs': len(swap_pairs),
+                'successful_swaps': 0,
+                'failed_swaps': len(swap_pairs),
+                'results': [],
+                'error': f"데이터베이스 오류로 인해 교환이 실패했습니다: {str(e)}"
+            }
+
+        return {
+            'success': successful_swaps == len(swap_pairs),
+            'total_pairs': len(swap_pairs),
+            'successful_swaps': successful_swaps,
+            'failed_swaps': len(swap_pairs) - successful_swaps,
+            'results': results
+        }
+
+    def _validate_swap(self, db: Session, a1: ShiftAssignment, a2: ShiftAssignment,
+                       admin_id: int, validation_level: str) -> Optional[str]:
+        """교환 양쪽 배정 검증, 실패 시 사유 반환"""
+        for assignment, new_employee_id in ((a1, a2.employee_id), (a2, a1.employee_id)):
+            validation_result = self.validation_engine.validate_shift_change(db, ChangeRequest(
+                assignment_id=assignment.id,
+                new_employee_id=new_employee_id,
+                change_type=ChangeType.EMPLOYEE_CHANGE,
+                admin_id=admin_id
+            ))
+
+            if not validation_result.valid:
+                return validation_result.error or "검증 실패로 인해 교환이 취소되었습니다"
+            if validation_level == "strict" and validation_result.warnings:
+                return "엄격 검증 모드에서 경고가 발생하여 교환이 취소되었습니다"
+
+        return None
+
     def rollback_change(self, db: Session, assignment_id: int, admin_id: int) -> ChangeResult:
         """변경사항 롤백"""
         try:
@@ -7,6 +7,8 @@ from typing import Dict, List, Optional, Any
 from datetime import date, datetime
 from dataclasses import dataclass
 
+from .utils.shift_calculator import ShiftCalculator
+
 
 class ValidationSeverity(Enum):
     """검증 위반 심각도"""
@@ -115,6 +117,7 @@ class EmployeeConstraints:
     forbidden_shifts: List[str]
     preferred_shifts: List[str]
     availability: Dict[str, List[str]]  # 요일별 가능 시간
+    is_active: bool = True
 
 
 @dataclass
@@ -134,25 +137,25 @@ class ValidationContext:
                  employee_constraints: EmployeeConstraints,
                  ward_rules: Dict[str, Any],
                  current_week_assignments: List[ShiftAssignmentData],
-                 current_month_assignments: List[ShiftAssignmentData]):
+                 current_month_assignments: List[ShiftAssignmentData],
+                 employment_rule: Optional[Any] = None,
+                 role_constraint: Optional[Any] = None):
         self.assignment_data = assignment_data
         self.employee_constraints = employee_constraints
         self.ward_rules = ward_rules
         self.current_week_assignments = current_week_assignments
         self.current_month_assignments = current_month_assignments
+        self.employment_rule = employment_rule
+        self.role_constraint = role_constraint
 
     def get_total_week_hours(self) -> int:
         """주간 총 근무시간 계산"""
-        from ..utils.shift_calculator import ShiftCalculator
-        calculator = ShiftCalculator()
-        return sum(calculator.get_shift_hours(a.shift_type)
+        return sum(ShiftCalculator.default_shift_hours(a.shift_type)
                   for a in self.current_week_assignments)
 
     def get_total_month_hours(self) -> int:
         """월간 총 근무시간 계산"""
-        from ..utils.shift_calculator import ShiftCalculator
-        calculator = ShiftCalculator()
-        return sum(calculator.get_shift_hours(a.shift_type)
+        return sum(ShiftCalculator.default_shift_hours(a.shift_type)
                   for a in self.current_month_assignments)
 
 
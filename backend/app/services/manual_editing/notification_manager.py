@@ -3,10 +3,10 @@
 Single Responsibility: 변경사항에 대한 알림 발송만 담당
 """
 from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 
 from .entities import ChangeRequest, ValidationResult, NotificationData
-from app.models.scheduling_models import ShiftAssignment
+from app.models.scheduling_models import ShiftAssignment, Schedule
 from app.models.models import Employee
 from app.services.notification_service import NotificationService
 from app.services.websocket_service import websocket_notification_service
@@ -83,6 +83,9 @@ class NotificationManager:
         recipients = set()
 
         try:
+            # ShiftAssignment에는 ward_id가 없으므로 스케줄의 병동 사용
+            ward_id = assignment.schedule.ward_id if assignment.schedule else None
+
             # 1. 변경 대상 직원
             if change_request.new_employee_id:
                 recipients.add(change_request.new_employee_id)
@@ -93,8 +96,8 @@ class NotificationManager:
                 recipients.add(assignment.employee_id)
 
             # 3. 같은 병동의 관리자들
-            ward_managers = db.query(Employee).filter(
-                Employee.ward_id == assignment.ward_id,
+            ward_managers = db.query(Employee).options(load_only(Employee.id)).filter(
+                Employee.ward_id == ward_id,
                 Employee.role.in_(['head_nurse', 'charge_nurse']),
                 Employee.is_active == True
             ).all()
@@ -104,15 +107,17 @@ class NotificationManager:
 
             # 4. 같은 날짜/교대의 다른 간호사들 (교대 변경의 경우)
             if change_request.new_shift_type:
-                same_shift_nurses = db.query(ShiftAssignment).filter(
-                    ShiftAssignment.ward_id == assignment.ward_id,
+                # 직원 ID만 필요하므로 해당 컬럼만 조회
+                same_shift_nurses = db.query(ShiftAssignment.employee_id).join(
+                    Schedule, Schedule.id == ShiftAssignment.schedule_id
+                ).filter(
+                    Schedule.ward_id == ward_id,
                     ShiftAssignment.shift_date == assignment.shift_date,
                     ShiftAssignment.shift_type == (change_request.new_shift_type or assignment.shift_type),
                     ShiftAssignment.employee_id != assignment.employee_id
                 ).all()
 
-                for shift_assignment in same_shift_nurses:
-                    recipients.add(shift_assignment.employee_id)
+                recipients.update(employee_id for employee_id, in same_shift_nurses)
 
         except Exception as e:
             logger.error(f"수신자 결정 중 오류 발생: {str(e)}")
@@ -293,7 +298,7 @@ class NotificationManager:
         """응급 상황 알림 발송"""
         try:
             # 병원 관리자들에게 응급 알림
-            hospital_admins = db.query(Employee).filter(
+            hospital_admins = db.query(Employee).options(load_only(Employee.id)).filter(
                 Employee.role == 'admin',
                 Employee.is_active == True
             ).all()
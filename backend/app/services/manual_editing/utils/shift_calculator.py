@@ -5,23 +5,33 @@ Single Responsibility: 근무 시간 계산만 담당
 from typing import Dict
 
 
+# 근무 타입별 기본 근무시간
+_SHIFT_HOURS: Dict[str, int] = {
+    'day': 8,
+    'evening': 8,
+    'night': 8,
+    'long_day': 12,
+    'off': 0,
+    'half_day': 4,
+    'overtime': 12
+}
+
+
 class ShiftCalculator:
     """근무 시간 계산기"""
 
     def __init__(self):
-        self.shift_hours_map = {
-            'day': 8,
-            'evening': 8,
-            'night': 8,
-            'off': 0,
-            'half_day': 4,
-            'overtime': 12
-        }
+        self.shift_hours_map = dict(_SHIFT_HOURS)
 
     def get_shift_hours(self, shift_type: str) -> int:
         """근무 타입별 시간 반환"""
         return self.shift_hours_map.get(shift_type.lower(), 8)
 
+    @staticmethod
+    def default_shift_hours(shift_type: str) -> int:
+        """기본 근무 타입별 시간 반환 (인스턴스 생성 불필요)"""
+        return _SHIFT_HOURS.get(shift_type.lower(), 8)
+
     def calculate_weekly_hours(self, assignments: list) -> int:
         """주간 총 근무시간 계산"""
         return sum(self.get_shift_hours(assignment.shift_type)
@@ -2,8 +2,10 @@
 검증 엔진
 Single Responsibility: 근무 변경 전 유효성 검증만 담당
 """
-from typing import List, Dict, Any, Optional
-from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+import calendar
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select, bindparam, and_, func, Row
 from sqlalchemy.orm import Session
 
 from .entities import (
@@ -15,12 +17,47 @@ from app.models.models import (
     Employee, Ward, ShiftRule,
     PreferenceTemplate, RoleConstraint, EmploymentTypeRule
 )
-from app.models.scheduling_models import ShiftAssignment
+from app.models.scheduling_models import ShiftAssignment, Schedule
 from app.services.pattern_validation_service import PatternValidationService
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 검증 경로에서 반복 실행되는 조회문 (모듈 로드 시 한 번 구성해 컴파일 캐시 재사용)
+# 배정 + 소속 병동 (ShiftAssignment에는 ward_id가 없으므로 스케줄을 통해 조회)
+_Q_ASSIGNMENT_BY_ID = select(ShiftAssignment, Ward).outerjoin(
+    Schedule, Schedule.id == ShiftAssignment.schedule_id
+).outerjoin(
+    Ward, Ward.id == Schedule.ward_id
+).where(ShiftAssignment.id == bindparam('aid'))
+# 직원 + 고용형태 규칙 + 역할 제약조건
+_Q_EMPLOYEE_WITH_RULES = select(Employee, EmploymentTypeRule, RoleConstraint).outerjoin(
+    EmploymentTypeRule, and_(
+        EmploymentTypeRule.employment_type == Employee.employment_type,
+        EmploymentTypeRule.is_active == True
+    )
+).outerjoin(
+    RoleConstraint, and_(
+        RoleConstraint.role == Employee.role,
+        RoleConstraint.is_active == True
+    )
+).where(Employee.id == bindparam('eid')).limit(1)
+# 아래 두 조회는 ORM 객체 대신 필요한 컬럼의 Row 튜플만 반환
+_Q_ASSIGNMENTS_IN_RANGE = select(
+    ShiftAssignment.id, ShiftAssignment.employee_id, ShiftAssignment.shift_date,
+    ShiftAssignment.shift_type, ShiftAssignment.schedule_id
+).where(
+    ShiftAssignment.employee_id == bindparam('eid'),
+    ShiftAssignment.shift_date >= bindparam('start'),
+    ShiftAssignment.shift_date < bindparam('end')
+)
+_Q_SCHEDULE_ASSIGNMENTS = select(
+    ShiftAssignment.id, ShiftAssignment.shift_date, ShiftAssignment.shift_type
+).where(
+    ShiftAssignment.employee_id == bindparam('eid'),
+    ShiftAssignment.schedule_id == bindparam('sid')
+)
+
 
 class ValidationEngine:
     """근무 변경 유효성 검증 엔진"""
@@ -43,11 +80,11 @@ class ValidationEngine:
         """근무 변경 전 종합 유효성 검증"""
         try:
             # 현재 배정 정보 조회
-            current_assignment = db.query(ShiftAssignment).filter(
-                ShiftAssignment.id == change_request.assignment_id
+            row = db.execute(
+                _Q_ASSIGNMENT_BY_ID, {'aid': change_request.assignment_id}
             ).first()
 
-            if not current_assignment:
+            if not row:
                 return ValidationResult(
                     valid=False,
                     warnings=[],
@@ -59,7 +96,8 @@ class ValidationEngine:
                 )
 
             # 검증 컨텍스트 구성
-            context = self._build_validation_context(db, current_assignment, change_request)
+            current_assignment, ward = row
+            context = self._build_validation_context(db, current_assignment, ward, change_request)
 
             # 모든 검증 실행
             all_violations = []
@@ -67,9 +105,15 @@ class ValidationEngine:
                 violations = validator(db, context, change_request)
                 all_violations.extend(violations)
 
-            # 위반사항 분류
-            warnings = [v for v in all_violations if v['severity'] in ['medium', 'low']]
-            errors = [v for v in all_violations if v['severity'] in ['critical', 'high']]
+            # 위반사항 분류 (한 번의 순회)
+            warnings = []
+            errors = []
+            for v in all_violations:
+                severity = v['severity']
+                if severity == 'critical' or severity == 'high':
+                    errors.append(v)
+                elif severity == 'medium' or severity == 'low':
+                    warnings.append(v)
 
             # 패턴 점수 계산
             pattern_score = self._calculate_pattern_score(db, context, change_request)
@@ -100,6 +144,7 @@ class ValidationEngine:
 
     def _build_validation_context(self, db: Session,
                                 current_assignment: ShiftAssignment,
+                                ward: Optional[Ward],
                                 change_request: ChangeRequest) -> ValidationContext:
         """검증 컨텍스트 구성"""
 
@@ -108,10 +153,11 @@ class ValidationEngine:
         target_date = change_request.new_shift_date or current_assignment.shift_date
         target_shift_type = change_request.new_shift_type or current_assignment.shift_type
 
-        # 직원 정보 조회
-        employee = db.query(Employee).filter(Employee.id == target_employee_id).first()
-        if not employee:
+        # 직원 정보 및 적용 규칙 조회
+        employee_row = db.execute(_Q_EMPLOYEE_WITH_RULES, {'eid': target_employee_id}).first()
+        if not employee_row:
             raise ValueError(f"직원 ID {target_employee_id}를 찾을 수 없습니다")
+        employee, employment_rule, role_constraint = employee_row
 
         # 근무 배정 데이터 구성
         assignment_data = ShiftAssignmentData(
@@ -120,25 +166,28 @@ class ValidationEngine:
             shift_date=target_date,
             shift_type=target_shift_type,
             schedule_id=current_assignment.schedule_id,
-            ward_id=current_assignment.ward_id
+            ward_id=ward.id if ward else None
         )
 
         # 직원 제약조건 구성
         employee_constraints = self._get_employee_constraints(db, employee)
 
-        # 병동 규칙 조회
-        ward_rules = self._get_ward_rules(db, current_assignment.ward_id)
+        # 병동 규칙
+        ward_rules = self._get_ward_rules(ward)
 
-        # 주간/월간 근무 배정 조회
-        week_assignments = self._get_week_assignments(db, target_employee_id, target_date)
-        month_assignments = self._get_month_assignments(db, target_employee_id, target_date)
+        # 주간/월간 근무 배정 조회 (한 번의 범위 조회)
+        week_assignments, month_assignments = self._get_period_assignments(
+            db, target_employee_id, target_date
+        )
 
         return ValidationContext(
             assignment_data=assignment_data,
             employee_constraints=employee_constraints,
             ward_rules=ward_rules,
             current_week_assignments=week_assignments,
-            current_month_assignments=month_assignments
+            current_month_assignments=month_assignments,
+            employment_rule=employment_rule,
+            role_constraint=role_constraint
         )
 
     def _validate_employee_existence(self, db: Session, context: ValidationContext,
@@ -146,13 +195,9 @@ class ValidationEngine:
         """직원 존재 여부 검증"""
         violations = []
 
+        # 대상 직원은 컨텍스트 구성 시 이미 조회됨
         if change_request.new_employee_id:
-            employee = db.query(Employee).filter(
-                Employee.id == change_request.new_employee_id,
-                Employee.is_active == True
-            ).first()
-
-            if not employee:
+            if not context.employee_constraints.is_active:
                 violations.append({
                     'type': 'employee_not_found',
                     'severity': ValidationSeverity.CRITICAL.value,
@@ -166,10 +211,7 @@ class ValidationEngine:
         """고용 형태별 규칙 검증"""
         violations = []
 
-        employment_rules = db.query(EmploymentTypeRule).filter(
-            EmploymentTypeRule.employment_type == context.employee_constraints.employment_type,
-            EmploymentTypeRule.is_active == True
-        ).first()
+        employment_rules = context.employment_rule
 
         if employment_rules:
             target_shift = change_request.new_shift_type or context.assignment_data.shift_type
@@ -188,10 +230,7 @@ class ValidationEngine:
         """역할별 제약조건 검증"""
         violations = []
 
-        role_constraints = db.query(RoleConstraint).filter(
-            RoleConstraint.role == context.employee_constraints.role,
-            RoleConstraint.is_active == True
-        ).first()
+        role_constraints = context.role_constraint
 
         if role_constraints:
             target_shift = change_request.new_shift_type or context.assignment_data.shift_type
@@ -260,10 +299,11 @@ class ValidationEngine:
                         'assignment_id': assignment.id
                     })
 
+            today = date.today()
             pattern_result = self.pattern_service.validate_employee_pattern(
                 db, context.assignment_data.employee_id, simulated_assignments,
-                datetime.now() - timedelta(days=30),
-                datetime.now() + timedelta(days=30)
+                today - timedelta(days=30),
+                today + timedelta(days=30)
             )
 
             for violation in pattern_result.get('violations', []):
@@ -295,11 +335,13 @@ class ValidationEngine:
         target_date = change_request.new_shift_date or context.assignment_data.shift_date
         target_shift = change_request.new_shift_type or context.assignment_data.shift_type
 
-        current_assignments = db.query(ShiftAssignment).filter(
-            ShiftAssignment.ward_id == context.assignment_data.ward_id,
+        current_assignments = db.query(func.count(ShiftAssignment.id)).join(
+            Schedule, Schedule.id == ShiftAssignment.schedule_id
+        ).filter(
+            Schedule.ward_id == context.assignment_data.ward_id,
             ShiftAssignment.shift_date == target_date,
             ShiftAssignment.shift_type == target_shift
-        ).count()
+        ).scalar()
 
         if current_assignments < min_nurses:
             violations.append({
@@ -320,12 +362,12 @@ class ValidationEngine:
             max_hours_per_month=getattr(employee, 'max_hours_per_month', 160),
             forbidden_shifts=[],
             preferred_shifts=[],
-            availability={}
+            availability={},
+            is_active=bool(employee.is_active)
         )
 
-    def _get_ward_rules(self, db: Session, ward_id: int) -> Dict[str, Any]:
-        """병동 규칙 조회"""
-        ward = db.query(Ward).filter(Ward.id == ward_id).first()
+    def _get_ward_rules(self, ward: Optional[Ward]) -> Dict[str, Any]:
+        """병동 규칙 구성"""
         if ward:
             return {
                 'min_nurses_per_shift': getattr(ward, 'min_nurses_per_shift', 3),
@@ -333,54 +375,53 @@ class ValidationEngine:
             }
         return {'min_nurses_per_shift': 3, 'max_nurses_per_shift': 10}
 
-    def _get_week_assignments(self, db: Session, employee_id: int, target_date: date) -> List[ShiftAssignmentData]:
-        """주간 근무 배정 조회"""
-        start_of_week = target_date - timedelta(days=target_date.weekday())
+    def _get_period_assignments(self, db: Session, employee_id: int,
+                                target_date: date) -> Tuple[List[ShiftAssignmentData], List[ShiftAssignmentData]]:
+        """주간/월간 근무 배정 조회 (두 기간을 덮는 범위를 한 번에 조회 후 분할)"""
+        target_day = target_date.date() if isinstance(target_date, datetime) else target_date
+
+        start_of_week = target_day - timedelta(days=target_day.weekday())
         end_of_week = start_of_week + timedelta(days=6)
+        start_of_month = target_day.replace(day=1)
+        end_of_month = start_of_month.replace(
+            day=calendar.monthrange(target_day.year, target_day.month)[1]
+        )
 
-        assignments = db.query(ShiftAssignment).filter(
-            ShiftAssignment.employee_id == employee_id,
-            ShiftAssignment.shift_date >= start_of_week,
-            ShiftAssignment.shift_date <= end_of_week
-        ).all()
+        range_start = min(start_of_week, start_of_month)
+        range_end = max(end_of_week, end_of_month)
 
-        return [ShiftAssignmentData(
-            id=a.id,
-            employee_id=a.employee_id,
-            shift_date=a.shift_date,
-            shift_type=a.shift_type,
-            schedule_id=a.schedule_id,
-            ward_id=a.ward_id
-        ) for a in assignments]
-
-    def _get_month_assignments(self, db: Session, employee_id: int, target_date: date) -> List[ShiftAssignmentData]:
-        """월간 근무 배정 조회"""
-        start_of_month = target_date.replace(day=1)
-        if target_date.month == 12:
-            end_of_month = target_date.replace(year=target_date.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            end_of_month = target_date.replace(month=target_date.month + 1, day=1) - timedelta(days=1)
-
-        assignments = db.query(ShiftAssignment).filter(
-            ShiftAssignment.employee_id == employee_id,
-            ShiftAssignment.shift_date >= start_of_month,
-            ShiftAssignment.shift_date <= end_of_month
+        assignments = db.execute(
+            _Q_ASSIGNMENTS_IN_RANGE,
+            {
+                'eid': employee_id,
+                'start': datetime.combine(range_start, time.min),
+                'end': datetime.combine(range_end + timedelta(days=1), time.min)
+            }
         ).all()
 
-        return [ShiftAssignmentData(
-            id=a.id,
-            employee_id=a.employee_id,
-            shift_date=a.shift_date,
-            shift_type=a.shift_type,
-            schedule_id=a.schedule_id,
-            ward_id=a.ward_id
-        ) for a in assignments]
-
-    def _get_employee_assignments(self, db: Session, employee_id: int, schedule_id: int) -> List[ShiftAssignment]:
-        """직원의 스케줄 내 모든 배정 조회"""
-        return db.query(ShiftAssignment).filter(
-            ShiftAssignment.employee_id == employee_id,
-            ShiftAssignment.schedule_id == schedule_id
+        week_assignments = []
+        month_assignments = []
+        for a in assignments:
+            shift_day = a.shift_date.date() if isinstance(a.shift_date, datetime) else a.shift_date
+            data = ShiftAssignmentData(
+                id=a.id,
+                employee_id=a.employee_id,
+                shift_date=a.shift_date,
+                shift_type=a.shift_type,
+                schedule_id=a.schedule_id,
+                ward_id=None
+            )
+            if start_of_week <= shift_day <= end_of_week:
+                week_assignments.append(data)
+            if start_of_month <= shift_day <= end_of_month:
+                month_assignments.append(data)
+
+        return week_assignments, month_assignments
+
+    def _get_employee_assignments(self, db: Session, employee_id: int, schedule_id: int) -> List[Row]:
+        """직원의 스케줄 내 모든 배정 조회 (id, shift_date, shift_type)"""
+        return db.execute(
+            _Q_SCHEDULE_ASSIGNMENTS, {'eid': employee_id, 'sid': schedule_id}
         ).all()
 
     def _calculate_pattern_score(self, db: Session, context: ValidationContext,
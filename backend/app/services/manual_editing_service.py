@@ -2,7 +2,7 @@
 통합 수동 편집 서비스
 SOLID 원칙에 따라 분리된 컴포넌트들을 조합하여 수동 편집 기능을 제공
 """
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Tuple
 from datetime import date
 from sqlalchemy.orm import Session
 
@@ -27,11 +27,15 @@ class ManualEditingService:
     """
 
     def __init__(self):
-        # 각 책임을 담당하는 컴포넌트들을 조합
+        # 각 책임을 담당하는 컴포넌트들을 조합 (ChangeApplier와 인스턴스 공유)
         self.validation_engine = ValidationEngine()
-        self.change_applier = ChangeApplier()
         self.audit_logger = AuditLogger()
         self.notification_manager = NotificationManager()
+        self.change_applier = ChangeApplier(
+            validation_engine=self.validation_engine,
+            audit_logger=self.audit_logger,
+            notification_manager=self.notification_manager
+        )
 
     def create_shift_change_request(self,
                                   assignment_id: int,
@@ -129,6 +133,11 @@ class ManualEditingService:
 
         return results
 
+    def bulk_shift_swap(self, db: Session, swap_pairs: List[Tuple[int, int]],
+                        admin_id: int, validation_level: str = "standard") -> Dict[str, Any]:
+        """일괄 근무 교환 (단일 트랜잭션)"""
+        return self.change_applier.bulk_swap_assignments(db, swap_pairs, admin_id, validation_level)
+
     def rollback_change(self, db: Session, assignment_id: int, admin_id: int) -> ChangeResult:
         """변경사항 롤백"""
         return self.change_applier.rollback_change(db, assignment_id, admin_id)
@@ -1,7 +1,8 @@
 """
 알림 및 승인 워크플로우 관리 서비스
 """
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable, Tuple
+from sqlalchemy import insert, update, select, literal
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from datetime import datetime, timedelta
@@ -16,6 +17,30 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# 기본 승인 권한 역할 (선임 이상)
+APPROVER_ROLES = frozenset({'senior_nurse', 'head_nurse', 'admin'})
+# 응급 상황 시 병원 전체 알림 대상 역할
+MANAGEMENT_ROLES = frozenset({'head_nurse', 'admin'})
+# 웹소켓 외에 이메일/SMS를 추가 발송하는 우선순위
+ESCALATED_PRIORITIES = frozenset({NotificationPriority.HIGH, NotificationPriority.URGENT})
+# 병원 전체로 브로드캐스트하는 응급 심각도
+BROADCAST_SEVERITIES = frozenset({"high", "critical"})
+ACTIVE_ALERT_STATUSES = frozenset({"active", "acknowledged"})
+
+# 대량 INSERT 한 문장당 최대 행 수 (DB 파라미터 개수 제한 및 메모리 급증 방지)
+BULK_INSERT_BATCH_SIZE = 1000
+
+def _chunked(items: List, size: int):
+    """리스트를 size 크기 묶음으로 나누기"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _get_user_full_name(db: Session, user_id: Optional[int]) -> Optional[str]:
+    """사용자 이름 컬럼만 조회 (관계 전체 로딩 없이)"""
+    if user_id is None:
+        return None
+    return db.query(User.full_name).filter(User.id == user_id).scalar()
+
 class NotificationService:
     """알림 시스템 관리 서비스"""
     
@@ -50,13 +75,14 @@ class NotificationService:
             )
             
             db.add(notification)
-            db.commit()
-            db.refresh(notification)
+            db.flush()
+            notification_id = notification.id
             
-            # 알림 발송 큐에 추가
-            self._queue_notification_delivery(db, notification)
+            # 알림 발송 큐에 추가 (알림과 같은 트랜잭션으로 한 번만 커밋)
+            self._queue_notifications_bulk(db, [notification])
+            db.commit()
             
-            logger.info(f"알림 생성 완료: {notification.id} -> 사용자 {recipient_id}")
+            logger.info(f"알림 생성 완료: {notification_id} -> 사용자 {recipient_id}")
             return notification
             
         except Exception as e:
@@ -80,30 +106,36 @@ class NotificationService:
         related_data: Optional[Dict] = None
     ) -> List[Notification]:
         """대량 알림 생성"""
+        # 수신자가 없으면 트랜잭션/커밋 없이 바로 반환
+        if not recipient_ids:
+            return []
+        
         try:
-            notifications = []
+            rows = [
+                {
+                    "recipient_id": recipient_id,
+                    "sender_id": sender_id,
+                    "notification_type": notification_type,
+                    "priority": priority,
+                    "title": title,
+                    "message": message,
+                    "ward_id": ward_id,
+                    "related_data": related_data
+                }
+                for recipient_id in recipient_ids
+            ]
             
-            for recipient_id in recipient_ids:
-                notification = Notification(
-                    recipient_id=recipient_id,
-                    sender_id=sender_id,
-                    notification_type=notification_type,
-                    priority=priority,
-                    title=title,
-                    message=message,
-                    ward_id=ward_id,
-                    related_data=related_data
-                )
-                notifications.append(notification)
+            # 묶음별 INSERT ... RETURNING으로 생성 (행별 refresh SELECT 없음)
+            notifications = []
+            for batch in _chunked(rows, BULK_INSERT_BATCH_SIZE):
+                notifications.extend(db.scalars(
+                    insert(Notification).returning(Notification), batch
+                ).all())
             
-            db.add_all(notifications)
+            # 발송 큐 항목도 같은 트랜잭션에서 한 번에 추가 후 커밋
+            self._queue_notifications_bulk(db, notifications)
             db.commit()
             
-            # 각 알림을 발송 큐에 추가
-            for notification in notifications:
-                db.refresh(notification)
-                self._queue_notification_delivery(db, notification)
-            
             logger.info(f"대량 알림 생성 완료: {len(notifications)}개 알림")
             return notifications
             
@@ -128,31 +160,44 @@ class NotificationService:
     ) -> List[Notification]:
         """병동별 알림 생성"""
         try:
-            # 병동의 모든 직원 조회
-            query = db.query(Employee).filter(Employee.ward_id == ward_id)
+            # 병동 직원 조회와 알림 생성을 INSERT ... SELECT 한 문장으로 처리
+            recipients = select(
+                Employee.user_id,
+                literal(sender_id, Notification.sender_id.type),
+                literal(notification_type, Notification.notification_type.type),
+                literal(priority, Notification.priority.type),
+                literal(title, Notification.title.type),
+                literal(message, Notification.message.type),
+                literal(ward_id, Notification.ward_id.type)
+            ).where(
+                Employee.ward_id == ward_id,
+                Employee.user_id.isnot(None)
+            )
             
             if role_filter:
-                query = query.filter(Employee.role == role_filter)
-            
-            employees = query.all()
-            recipient_ids = [emp.user_id for emp in employees if emp.user_id]
+                recipients = recipients.where(Employee.role == role_filter)
+            
+            notifications = db.scalars(
+                insert(Notification).from_select(
+                    ["recipient_id", "sender_id", "notification_type", "priority",
+                     "title", "message", "ward_id"],
+                    recipients
+                ).returning(Notification)
+            ).all()
             
-            if not recipient_ids:
+            if not notifications:
                 logger.warning(f"병동 {ward_id}에 알림 대상자가 없음")
                 return []
             
-            return self.create_bulk_notification(
-                db=db,
-                recipient_ids=recipient_ids,
-                notification_type=notification_type,
-                title=title,
-                message=message,
-                sender_id=sender_id,
-                priority=priority,
-                ward_id=ward_id
-            )
+            # 발송 큐 항목도 같은 트랜잭션에서 한 번에 추가 후 커밋
+            self._queue_notifications_bulk(db, notifications)
+            db.commit()
+            
+            logger.info(f"병동별 알림 생성 완료: 병동 {ward_id}, {len(notifications)}개 알림")
+            return notifications
             
         except Exception as e:
+            db.rollback()
             logger.error(f"병동별 알림 생성 실패: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -162,6 +207,23 @@ class NotificationService:
     def mark_as_read(self, db: Session, notification_id: int, user_id: int) -> Notification:
         """알림을 읽음으로 표시"""
         try:
+            # 읽지 않은 경우에만 조건부 UPDATE 한 번으로 처리
+            notification = db.scalars(
+                update(Notification).where(
+                    Notification.id == notification_id,
+                    Notification.recipient_id == user_id,
+                    Notification.is_read == False
+                ).values(
+                    is_read=True,
+                    read_at=datetime.utcnow()
+                ).returning(Notification)
+            ).first()
+            
+            if notification:
+                db.commit()
+                return notification
+            
+            # 갱신된 행이 없으면 이미 읽었거나 존재하지 않는 알림
             notification = db.query(Notification).filter(
                 Notification.id == notification_id,
                 Notification.recipient_id == user_id
@@ -173,12 +235,6 @@ class NotificationService:
                     detail="알림을 찾을 수 없습니다"
                 )
             
-            if not notification.is_read:
-                notification.is_read = True
-                notification.read_at = datetime.utcnow()
-                db.commit()
-                db.refresh(notification)
-            
             return notification
             
         except HTTPException:
@@ -197,9 +253,10 @@ class NotificationService:
         user_id: int,
         unread_only: bool = False,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[Tuple[datetime, int]] = None
     ) -> List[Notification]:
-        """사용자 알림 목록 조회"""
+        """사용자 알림 목록 조회 (cursor: 이전 페이지 마지막 알림의 (created_at, id))"""
         try:
             query = db.query(Notification).filter(Notification.recipient_id == user_id)
             
@@ -212,9 +269,22 @@ class NotificationService:
                 (Notification.expires_at.is_(None)) | (Notification.expires_at > now)
             )
             
-            notifications = query.order_by(
-                Notification.created_at.desc()
-            ).offset(offset).limit(limit).all()
+            query = query.order_by(
+                Notification.created_at.desc(),
+                Notification.id.desc()
+            )
+            
+            # 커서가 있으면 OFFSET 대신 (created_at, id) 기준 키셋 페이지네이션
+            if cursor is not None:
+                cursor_created_at, cursor_id = cursor
+                query = query.filter(
+                    (Notification.created_at < cursor_created_at) |
+                    ((Notification.created_at == cursor_created_at) & (Notification.id < cursor_id))
+                )
+            else:
+                query = query.offset(offset)
+            
+            notifications = query.limit(limit).all()
             
             return notifications
             
@@ -225,54 +295,58 @@ class NotificationService:
                 detail="알림 조회 중 오류 발생"
             )
     
-    def _queue_notification_delivery(self, db: Session, notification: Notification):
-        """알림을 발송 큐에 추가"""
-        try:
+    def _queue_notifications_bulk(self, db: Session, notifications: List[Notification]):
+        """여러 알림의 발송 큐 항목을 모아 한 번에 추가 (커밋은 호출자가 담당)"""
+        # 추가 채널이 필요한 알림 타입의 템플릿 설정을 한 번에 조회
+        escalated_types = {
+            n.notification_type for n in notifications if n.priority in ESCALATED_PRIORITIES
+        }
+        channels_by_type = self._get_template_channels(db, escalated_types)
+        
+        rows = []
+        for notification in notifications:
             # WebSocket 실시간 알림
-            websocket_queue = NotificationQueue(
-                notification_id=notification.id,
-                channel="websocket",
-                status="pending"
-            )
-            db.add(websocket_queue)
+            rows.append({"notification_id": notification.id, "channel": "websocket", "status": "pending"})
             
             # 우선순위가 높은 경우 추가 채널 고려
-            if notification.priority in [NotificationPriority.HIGH, NotificationPriority.URGENT]:
+            if notification.priority in ESCALATED_PRIORITIES:
+                send_email, send_sms = channels_by_type.get(notification.notification_type, (False, False))
                 # 이메일 알림 큐 추가 (템플릿 설정이 있는 경우)
-                template = self._get_notification_template(db, notification.notification_type)
-                if template and template.send_email:
-                    email_queue = NotificationQueue(
-                        notification_id=notification.id,
-                        channel="email",
-                        status="pending"
-                    )
-                    db.add(email_queue)
+                if send_email:
+                    rows.append({"notification_id": notification.id, "channel": "email", "status": "pending"})
                 
                 # SMS 알림 큐 추가 (긴급한 경우)
-                if notification.priority == NotificationPriority.URGENT and template and template.send_sms:
-                    sms_queue = NotificationQueue(
-                        notification_id=notification.id,
-                        channel="sms",
-                        status="pending"
-                    )
-                    db.add(sms_queue)
-            
-            db.commit()
-            
-        except Exception as e:
-            logger.error(f"알림 큐 추가 실패: {str(e)}")
+                if notification.priority == NotificationPriority.URGENT and send_sms:
+                    rows.append({"notification_id": notification.id, "channel": "sms", "status": "pending"})
+        
+        # Core executemany (insertmanyvalues) - 묶음별로 한 번의 왕복으로 전송
+        for batch in _chunked(rows, BULK_INSERT_BATCH_SIZE):
+            db.execute(insert(NotificationQueue), batch)
     
-    def _get_notification_template(
-        self, 
-        db: Session, 
-        notification_type: NotificationType
-    ) -> Optional[NotificationTemplate]:
-        """알림 타입에 해당하는 템플릿 조회"""
-        return db.query(NotificationTemplate).filter(
-            NotificationTemplate.notification_type == notification_type,
+    def _get_template_channels(
+        self,
+        db: Session,
+        notification_types: Iterable[NotificationType]
+    ) -> Dict[NotificationType, Tuple[bool, bool]]:
+        """알림 타입별 템플릿 추가 채널 설정 (send_email, send_sms) 조회"""
+        notification_types = set(notification_types)
+        if not notification_types:
+            return {}
+        
+        # 호출마다 필요한 타입만 한 번의 IN 조회로 가져오기 (템플릿 변경이 바로 반영됨)
+        channels = {}
+        for notification_type, send_email, send_sms in db.query(
+            NotificationTemplate.notification_type,
+            NotificationTemplate.send_email,
+            NotificationTemplate.send_sms
+        ).filter(
+            NotificationTemplate.notification_type.in_(notification_types),
             NotificationTemplate.is_active == True
-        ).first()
-
+        ):
+            # 타입별 첫 번째 템플릿 사용
+            channels.setdefault(notification_type, (bool(send_email), bool(send_sms)))
+        
+        return channels
 
 class ApprovalWorkflowService:
     """승인 워크플로우 관리 서비스"""
@@ -335,9 +409,12 @@ class ApprovalWorkflowService:
     ) -> ApprovalWorkflow:
         """승인 요청 승인"""
         try:
-            workflow = db.query(ApprovalWorkflow).filter(
+            # 승인 요청과 승인자 직원 정보를 한 번에 조회
+            workflow, approver = db.query(ApprovalWorkflow, Employee).outerjoin(
+                Employee, Employee.user_id == approver_id
+            ).filter(
                 ApprovalWorkflow.id == workflow_id
-            ).first()
+            ).first() or (None, None)
             
             if not workflow:
                 raise HTTPException(
@@ -352,7 +429,7 @@ class ApprovalWorkflowService:
                 )
             
             # 승인자 권한 검증
-            if not self._verify_approver_permission(db, workflow, approver_id):
+            if not self._verify_approver_permission(workflow, approver):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="승인 권한이 없습니다"
@@ -391,9 +468,12 @@ class ApprovalWorkflowService:
     ) -> ApprovalWorkflow:
         """승인 요청 거부"""
         try:
-            workflow = db.query(ApprovalWorkflow).filter(
+            # 승인 요청과 승인자 직원 정보를 한 번에 조회
+            workflow, approver = db.query(ApprovalWorkflow, Employee).outerjoin(
+                Employee, Employee.user_id == approver_id
+            ).filter(
                 ApprovalWorkflow.id == workflow_id
-            ).first()
+            ).first() or (None, None)
             
             if not workflow:
                 raise HTTPException(
@@ -408,7 +488,7 @@ class ApprovalWorkflowService:
                 )
             
             # 승인자 권한 검증
-            if not self._verify_approver_permission(db, workflow, approver_id):
+            if not self._verify_approver_permission(workflow, approver):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="승인 권한이 없습니다"
@@ -490,13 +570,15 @@ class ApprovalWorkflowService:
                 logger.warning(f"승인 요청 {workflow.id}에 대한 승인자가 없음")
                 return
             
+            requester_name = _get_user_full_name(db, workflow.requester_id)
+            
             # 승인 요청 알림 생성
             self.notification_service.create_bulk_notification(
                 db=db,
                 recipient_ids=approver_ids,
                 notification_type=NotificationType.APPROVAL_REQUEST,
                 title=f"승인 요청: {workflow.title}",
-                message=f"{workflow.description}\n요청자: {workflow.requester.name if workflow.requester else 'Unknown'}",
+                message=f"{workflow.description}\n요청자: {requester_name or 'Unknown'}",
                 priority=workflow.priority,
                 related_data={'workflow_id': workflow.id, 'request_type': workflow.request_type}
             )
@@ -535,17 +617,16 @@ class ApprovalWorkflowService:
     def _find_eligible_approvers(self, db: Session, workflow: ApprovalWorkflow) -> List[int]:
         """승인 권한을 가진 사용자 목록 조회"""
         try:
-            query = db.query(Employee)
+            query = db.query(Employee.user_id).filter(Employee.user_id.isnot(None))
             
             # 역할 기반 필터링
             if workflow.required_role:
                 query = query.filter(Employee.role == workflow.required_role)
             else:
                 # 기본적으로 선임 이상 역할에게 승인 권한
-                query = query.filter(Employee.role.in_(['senior_nurse', 'head_nurse', 'admin']))
+                query = query.filter(Employee.role.in_(APPROVER_ROLES))
             
-            employees = query.all()
-            return [emp.user_id for emp in employees if emp.user_id]
+            return [user_id for user_id, in query.all()]
             
         except Exception as e:
             logger.error(f"승인자 조회 실패: {str(e)}")
@@ -553,13 +634,11 @@ class ApprovalWorkflowService:
     
     def _verify_approver_permission(
         self, 
-        db: Session, 
         workflow: ApprovalWorkflow, 
-        approver_id: int
+        approver: Optional[Employee]
     ) -> bool:
         """승인자 권한 검증"""
         try:
-            approver = db.query(Employee).filter(Employee.user_id == approver_id).first()
             if not approver:
                 return False
             
@@ -572,7 +651,7 @@ class ApprovalWorkflowService:
                 return approver.role == workflow.required_role
             
             # 기본적으로 선임 이상에게 승인 권한
-            return approver.role in ['senior_nurse', 'head_nurse', 'admin']
+            return approver.role in APPROVER_ROLES
             
         except Exception as e:
             logger.error(f"승인자 권한 검증 실패: {str(e)}")
@@ -727,7 +806,7 @@ class EmergencyAlertService:
         """활성 응급 알림 목록 조회"""
         try:
             query = db.query(EmergencyAlert).filter(
-                EmergencyAlert.status.in_(["active", "acknowledged"])
+                EmergencyAlert.status.in_(ACTIVE_ALERT_STATUSES)
             )
             
             if ward_id:
@@ -751,7 +830,7 @@ class EmergencyAlertService:
         """응급 상황 알림 브로드캐스트"""
         try:
             # 심각도에 따른 알림 범위 결정
-            if alert.severity in ["high", "critical"]:
+            if alert.severity in BROADCAST_SEVERITIES:
                 # 전체 병원 알림
                 self._notify_all_management(db, alert)
             else:
@@ -772,19 +851,21 @@ class EmergencyAlertService:
         """관리자 전체에게 응급 알림"""
         try:
             # 수간호사 및 관리자에게 알림
-            managers = db.query(Employee).filter(
-                Employee.role.in_(['head_nurse', 'admin'])
-            ).all()
-            
-            manager_user_ids = [mgr.user_id for mgr in managers if mgr.user_id]
+            manager_user_ids = [
+                user_id for user_id, in db.query(Employee.user_id).filter(
+                    Employee.role.in_(MANAGEMENT_ROLES),
+                    Employee.user_id.isnot(None)
+                ).all()
+            ]
             
             if manager_user_ids:
+                ward_name = db.query(Ward.name).filter(Ward.id == alert.ward_id).scalar()
                 self.notification_service.create_bulk_notification(
                     db=db,
                     recipient_ids=manager_user_ids,
                     notification_type=NotificationType.EMERGENCY_REQUEST,
                     title=f"🚨 긴급상황: {alert.title}",
-                    message=f"병동: {alert.ward.name if alert.ward else '미지정'}\n{alert.description}\n{alert.action_required or ''}",
+                    message=f"병동: {ward_name or '미지정'}\n{alert.description}\n{alert.action_required or ''}",
                     priority=NotificationPriority.URGENT,
                     related_data={
                         'alert_id': alert.id,
@@ -799,13 +880,15 @@ class EmergencyAlertService:
     def _notify_alert_acknowledged(self, db: Session, alert: EmergencyAlert):
         """응급 알림 확인 통지"""
         try:
+            acknowledged_name = _get_user_full_name(db, alert.acknowledged_by)
+            
             # 관리자들에게 확인 통지
             self.notification_service.create_ward_notification(
                 db=db,
                 ward_id=alert.ward_id,
                 notification_type=NotificationType.SYSTEM_ALERT,
                 title=f"응급상황 확인됨: {alert.title}",
-                message=f"담당자가 확인했습니다.\n확인자: {alert.acknowledged_user.name if alert.acknowledged_user else '미지정'}",
+                message=f"담당자가 확인했습니다.\n확인자: {acknowledged_name or '미지정'}",
                 priority=NotificationPriority.MEDIUM,
                 role_filter="head_nurse"
             )
@@ -816,13 +899,15 @@ class EmergencyAlertService:
     def _notify_alert_resolved(self, db: Session, alert: EmergencyAlert):
         """응급 알림 해결 통지"""
         try:
+            resolved_name = _get_user_full_name(db, alert.resolved_by)
+            
             # 관리자들에게 해결 통지
             self.notification_service.create_ward_notification(
                 db=db,
                 ward_id=alert.ward_id,
                 notification_type=NotificationType.SYSTEM_ALERT,
                 title=f"응급상황 해결: {alert.title}",
-                message=f"응급상황이 해결되었습니다.\n해결자: {alert.resolved_user.name if alert.resolved_user else '미지정'}",
+                message=f"응급상황이 해결되었습니다.\n해결자: {resolved_name or '미지정'}",
                 priority=NotificationPriority.LOW,
                 role_filter="head_nurse"
             )
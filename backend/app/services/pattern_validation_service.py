@@ -1,5 +1,10 @@
-from typing import List, Dict, Tuple, Optional
-from datetime import datetime, timedelta
+from collections import Counter
+from itertools import groupby
+from operator import itemgetter
+from types import MappingProxyType
+from typing import List, Dict, Mapping, NamedTuple, Tuple, Optional
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from app.models.models import Employee
 from app.models.scheduling_models import Schedule, ShiftAssignment
@@ -7,26 +12,33 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+class PatternSpec(NamedTuple):
+    """위험 패턴의 패널티와 설명"""
+    penalty: int
+    description: str
+
+# 위험한 패턴 정의
+DANGEROUS_PATTERNS: Mapping[str, PatternSpec] = MappingProxyType({
+    'day_to_night': PatternSpec(-30, 'Day 다음날 Night 근무'),
+    'excessive_nights': PatternSpec(-30, '연속 3일 이상 Night 근무'),
+    'no_rest_after_nights': PatternSpec(-25, 'Night 근무 후 충분한 휴식 없음'),
+    'weekend_overload': PatternSpec(-20, '주말 연속 근무 과부하'),
+    'split_shifts': PatternSpec(-15, '분할 근무 패턴'),
+})
+
 class PatternValidationService:
     """근무 패턴 검증 서비스 - 피로도 누적 방지 및 안전한 근무 패턴 보장"""
     
     def __init__(self):
-        # 위험한 패턴 정의
-        self.dangerous_patterns = {
-            'day_to_night': {'penalty': -30, 'description': 'Day 다음날 Night 근무'},
-            'excessive_nights': {'penalty': -30, 'description': '연속 3일 이상 Night 근무'},
-            'no_rest_after_nights': {'penalty': -25, 'description': 'Night 근무 후 충분한 휴식 없음'},
-            'weekend_overload': {'penalty': -20, 'description': '주말 연속 근무 과부하'},
-            'split_shifts': {'penalty': -15, 'description': '분할 근무 패턴'},
-        }
+        self.dangerous_patterns = DANGEROUS_PATTERNS
     
     def validate_employee_pattern(
         self, 
         db: Session, 
         employee_id: int, 
         assignments: List[Dict],
-        period_start: datetime,
-        period_end: datetime
+        period_start: date,
+        period_end: date
     ) -> Dict:
         """직원별 근무 패턴 검증"""
         try:
@@ -35,9 +47,11 @@ class PatternValidationService:
             
             # 시간순으로 정렬된 배정 리스트
             sorted_assignments = sorted(assignments, key=lambda x: x['shift_date'])
+            # 날짜 문자열은 여기서 한 번만 파싱해 각 검사에서 재사용 (YYYY-MM-DD 고정 형식)
+            dates = [date.fromisoformat(a['shift_date']) for a in sorted_assignments]
             
             # 1. Day → Next Day Night 패턴 검사
-            day_night_violations = self._check_day_to_night_pattern(sorted_assignments)
+            day_night_violations = self._check_day_to_night_pattern(sorted_assignments, dates)
             violations.extend(day_night_violations)
             
             # 2. 연속 야간 근무 검사
@@ -45,11 +59,11 @@ class PatternValidationService:
             violations.extend(consecutive_night_violations)
             
             # 3. 야간 근무 후 휴식 검사
-            night_rest_violations = self._check_night_rest_pattern(sorted_assignments)
+            night_rest_violations = self._check_night_rest_pattern(sorted_assignments, dates)
             violations.extend(night_rest_violations)
             
             # 4. 주말 과부하 검사
-            weekend_violations = self._check_weekend_overload(sorted_assignments)
+            weekend_violations = self._check_weekend_overload(sorted_assignments, dates)
             violations.extend(weekend_violations)
             
             # 5. 분할 근무 패턴 검사
@@ -80,7 +94,7 @@ class PatternValidationService:
                 'recommendations': ['시스템 관리자에게 문의하세요']
             }
     
-    def _check_day_to_night_pattern(self, assignments: List[Dict]) -> List[Dict]:
+    def _check_day_to_night_pattern(self, assignments: List[Dict], dates: List[date]) -> List[Dict]:
         """Day 근무 다음날 Night 근무 패턴 검사"""
         violations = []
         
@@ -88,15 +102,15 @@ class PatternValidationService:
             current = assignments[i]
             next_shift = assignments[i + 1]
             
-            current_date = datetime.strptime(current['shift_date'], '%Y-%m-%d').date()
-            next_date = datetime.strptime(next_shift['shift_date'], '%Y-%m-%d').date()
+            current_date = dates[i]
+            next_date = dates[i + 1]
             
             # 연속된 날짜인지 확인
             if (next_date - current_date).days == 1:
                 if current['shift_type'] == 'day' and next_shift['shift_type'] == 'night':
                     violations.append({
                         'type': 'day_to_night',
-                        'penalty': self.dangerous_patterns['day_to_night']['penalty'],
+                        'penalty': self.dangerous_patterns['day_to_night'].penalty,
                         'description': f"{current_date} Day → {next_date} Night 근무",
                         'date_range': f"{current_date} ~ {next_date}",
                         'severity': 'high'
@@ -110,7 +124,7 @@ class PatternValidationService:
         consecutive_nights = 0
         start_date = None
         
-        for assignment in assignments:
+        for idx, assignment in enumerate(assignments):
             if assignment['shift_type'] == 'night':
                 if consecutive_nights == 0:
                     start_date = assignment['shift_date']
@@ -119,9 +133,9 @@ class PatternValidationService:
                 if consecutive_nights > 3:  # 3일 초과 시 위반
                     violations.append({
                         'type': 'excessive_nights',
-                        'penalty': self.dangerous_patterns['excessive_nights']['penalty'],
+                        'penalty': self.dangerous_patterns['excessive_nights'].penalty,
                         'description': f"연속 {consecutive_nights}일 Night 근무",
-                        'date_range': f"{start_date} ~ {assignments[assignments.index(assignment)-1]['shift_date']}",
+                        'date_range': f"{start_date} ~ {assignments[idx - 1]['shift_date']}",
                         'severity': 'high' if consecutive_nights > 4 else 'medium'
                     })
                 consecutive_nights = 0
@@ -131,7 +145,7 @@ class PatternValidationService:
         if consecutive_nights > 3:
             violations.append({
                 'type': 'excessive_nights',
-                'penalty': self.dangerous_patterns['excessive_nights']['penalty'],
+                'penalty': self.dangerous_patterns['excessive_nights'].penalty,
                 'description': f"연속 {consecutive_nights}일 Night 근무",
                 'date_range': f"{start_date} ~ {assignments[-1]['shift_date']}",
                 'severity': 'high' if consecutive_nights > 4 else 'medium'
@@ -139,7 +153,7 @@ class PatternValidationService:
         
         return violations
     
-    def _check_night_rest_pattern(self, assignments: List[Dict]) -> List[Dict]:
+    def _check_night_rest_pattern(self, assignments: List[Dict], dates: List[date]) -> List[Dict]:
         """야간 근무 후 충분한 휴식 시간 검사"""
         violations = []
         
@@ -148,8 +162,8 @@ class PatternValidationService:
             next_shift = assignments[i + 1]
             
             if current['shift_type'] == 'night':
-                current_date = datetime.strptime(current['shift_date'], '%Y-%m-%d').date()
-                next_date = datetime.strptime(next_shift['shift_date'], '%Y-%m-%d').date()
+                current_date = dates[i]
+                next_date = dates[i + 1]
                 
                 # 야간 근무 후 다음 근무까지의 간격
                 days_gap = (next_date - current_date).days
@@ -157,7 +171,7 @@ class PatternValidationService:
                 if days_gap == 1:  # 야간 근무 다음날 바로 근무
                     violations.append({
                         'type': 'no_rest_after_nights',
-                        'penalty': self.dangerous_patterns['no_rest_after_nights']['penalty'],
+                        'penalty': self.dangerous_patterns['no_rest_after_nights'].penalty,
                         'description': f"Night 근무 후 충분한 휴식 없음 ({current_date} Night → {next_date} {next_shift['shift_type']})",
                         'date_range': f"{current_date} ~ {next_date}",
                         'severity': 'medium'
@@ -165,25 +179,23 @@ class PatternValidationService:
         
         return violations
     
-    def _check_weekend_overload(self, assignments: List[Dict]) -> List[Dict]:
+    def _check_weekend_overload(self, assignments: List[Dict], dates: List[date]) -> List[Dict]:
         """주말 과부하 패턴 검사"""
         violations = []
-        weekend_counts = {}
         
-        for assignment in assignments:
-            date = datetime.strptime(assignment['shift_date'], '%Y-%m-%d').date()
-            week_num = date.isocalendar()[1]  # 주차
-            
-            if date.weekday() >= 5:  # 토요일(5), 일요일(6)
-                if week_num not in weekend_counts:
-                    weekend_counts[week_num] = 0
-                weekend_counts[week_num] += 1
+        # 서수(ordinal) 1은 월요일이므로 정수 연산만으로 요일과 주(월~일) 구간 계산
+        weekend_counts = Counter(
+            (ordinal - 1) // 7
+            for ordinal in map(date.toordinal, dates)
+            if (ordinal + 6) % 7 >= 5  # 토요일(5), 일요일(6)
+        )
         
-        for week_num, count in weekend_counts.items():
+        for week_bucket, count in weekend_counts.items():
             if count >= 2:  # 주말 이틀 모두 근무
+                week_num = date.fromordinal(week_bucket * 7 + 1).isocalendar()[1]  # 주차
                 violations.append({
                     'type': 'weekend_overload',
-                    'penalty': self.dangerous_patterns['weekend_overload']['penalty'],
+                    'penalty': self.dangerous_patterns['weekend_overload'].penalty,
                     'description': f"{week_num}주차 주말 연속 근무 ({count}일)",
                     'date_range': f"Week {week_num}",
                     'severity': 'low'
@@ -194,21 +206,16 @@ class PatternValidationService:
     def _check_split_shifts(self, assignments: List[Dict]) -> List[Dict]:
         """분할 근무 패턴 검사 (하루 안에 여러 근무)"""
         violations = []
-        date_shifts = {}
         
-        for assignment in assignments:
-            date = assignment['shift_date']
-            if date not in date_shifts:
-                date_shifts[date] = []
-            date_shifts[date].append(assignment['shift_type'])
-        
-        for date, shifts in date_shifts.items():
+        # 배정 목록은 날짜순으로 정렬되어 있으므로 같은 날짜끼리 바로 묶음
+        for shift_date, group in groupby(assignments, key=itemgetter('shift_date')):
+            shifts = [assignment['shift_type'] for assignment in group]
             if len(shifts) > 1:  # 하루에 여러 근무
                 violations.append({
                     'type': 'split_shifts',
-                    'penalty': self.dangerous_patterns['split_shifts']['penalty'],
-                    'description': f"분할 근무: {date}에 {', '.join(shifts)} 근무",
-                    'date_range': date,
+                    'penalty': self.dangerous_patterns['split_shifts'].penalty,
+                    'description': f"분할 근무: {shift_date}에 {', '.join(shifts)} 근무",
+                    'date_range': shift_date,
                     'severity': 'low'
                 })
         
@@ -247,9 +254,14 @@ class PatternValidationService:
     ) -> Dict:
         """전체 스케줄의 패턴 검증"""
         try:
-            # 스케줄의 모든 배정 조회
-            assignments = db.query(ShiftAssignment).filter(
-                ShiftAssignment.schedule_id == schedule_id
+            # 스케줄의 모든 배정 조회 (검증에 필요한 컬럼만 튜플로)
+            assignments = db.execute(
+                select(
+                    ShiftAssignment.employee_id,
+                    ShiftAssignment.shift_date,
+                    ShiftAssignment.shift_type,
+                    ShiftAssignment.id
+                ).where(ShiftAssignment.schedule_id == schedule_id)
             ).all()
             
             if not assignments:
@@ -262,16 +274,23 @@ class PatternValidationService:
                     'summary': '배정된 근무가 없습니다'
                 }
             
-            # 직원별로 그룹화
+            # 직원별로 그룹화하면서 근무 기간(최소/최대 날짜)도 함께 계산
             employee_assignments = {}
-            for assignment in assignments:
-                if assignment.employee_id not in employee_assignments:
-                    employee_assignments[assignment.employee_id] = []
+            for employee_id, shift_date, shift_type, assignment_id in assignments:
+                bucket = employee_assignments.get(employee_id)
+                if bucket is None:
+                    bucket = employee_assignments[employee_id] = {
+                        'assignments': [], 'start': shift_date, 'end': shift_date
+                    }
+                elif shift_date < bucket['start']:
+                    bucket['start'] = shift_date
+                elif shift_date > bucket['end']:
+                    bucket['end'] = shift_date
                 
-                employee_assignments[assignment.employee_id].append({
-                    'shift_date': assignment.shift_date.strftime('%Y-%m-%d'),
-                    'shift_type': assignment.shift_type,
-                    'assignment_id': assignment.id
+                bucket['assignments'].append({
+                    'shift_date': shift_date.strftime('%Y-%m-%d'),
+                    'shift_type': shift_type,
+                    'assignment_id': assignment_id
                 })
             
             employee_results = []
@@ -279,12 +298,10 @@ class PatternValidationService:
             total_penalty = 0
             
             # 각 직원별 패턴 검증
-            for employee_id, emp_assignments in employee_assignments.items():
-                period_start = min([datetime.strptime(a['shift_date'], '%Y-%m-%d') for a in emp_assignments])
-                period_end = max([datetime.strptime(a['shift_date'], '%Y-%m-%d') for a in emp_assignments])
-                
+            for employee_id, bucket in employee_assignments.items():
                 result = self.validate_employee_pattern(
-                    db, employee_id, emp_assignments, period_start, period_end
+                    db, employee_id, bucket['assignments'],
+                    bucket['start'].date(), bucket['end'].date()
                 )
                 employee_results.append(result)
                 total_violations += len(result['violations'])
@@ -315,7 +332,7 @@ class PatternValidationService:
     def _generate_schedule_summary(self, employee_results: List[Dict]) -> str:
         """스케줄 전체 패턴 검증 요약 생성"""
         total_employees = len(employee_results)
-        valid_employees = len([r for r in employee_results if r['is_valid']])
+        valid_employees = sum(1 for r in employee_results if r['is_valid'])
         
         if valid_employees == total_employees:
             return f"모든 직원({total_employees}명)의 근무 패턴이 안전합니다"
@@ -326,13 +343,15 @@ class PatternValidationService:
     def get_pattern_statistics(self, db: Session, ward_id: int, period_start: datetime, period_end: datetime) -> Dict:
         """병동별 패턴 통계 생성"""
         try:
-            # 해당 병동의 직원들 조회
-            employees = db.query(Employee).filter(Employee.ward_id == ward_id).all()
+            # 해당 병동의 직원 수 조회 (직원 행 전체를 불러오지 않음)
+            total_employees = db.query(func.count(Employee.id)).filter(
+                Employee.ward_id == ward_id
+            ).scalar()
             
             pattern_stats = {
                 'ward_id': ward_id,
                 'period': f"{period_start.strftime('%Y-%m-%d')} ~ {period_end.strftime('%Y-%m-%d')}",
-                'total_employees': len(employees),
+                'total_employees': total_employees,
                 'pattern_violations': {
                     'day_to_night': 0,
                     'excessive_nights': 0,
@@ -1,7 +1,11 @@
 """
 권한 관리 서비스 - Manual editing & emergency override 권한 제어
 """
-from typing import List, Dict, Optional
+from bisect import bisect_right
+import inspect
+from functools import lru_cache, wraps
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Tuple
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.models.models import User, Employee
@@ -9,33 +13,55 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 권한 레벨 정의
+PERMISSION_LEVELS: Mapping[str, int] = MappingProxyType({
+    'admin': 5,           # 시스템 관리자 - 모든 권한
+    'head_nurse': 4,      # 수간호사 - 병동 내 모든 권한
+    'senior_nurse': 3,    # 선임 간호사 - 제한적 편집 권한
+    'staff_nurse': 2,     # 일반 간호사 - 기본 편집 권한
+    'new_nurse': 1        # 신입 간호사 - 읽기 전용
+})
+
+# 기능별 최소 권한 레벨
+REQUIRED_PERMISSIONS: Mapping[str, int] = MappingProxyType({
+    'view_schedule': 1,           # 스케줄 조회
+    'edit_own_requests': 1,       # 본인 근무 희망 편집
+    'basic_schedule_edit': 2,     # 기본 스케줄 편집
+    'shift_swap': 2,             # 근무 교환
+    'emergency_request': 2,       # 응급 상황 요청
+    'approve_swap': 3,           # 근무 교환 승인
+    'manual_override': 3,        # 수동 오버라이드 (제한적)
+    'emergency_override': 4,     # 응급 오버라이드
+    'schedule_publish': 4,       # 스케줄 발행
+    'bulk_edit': 4,              # 대량 편집
+    'system_override': 5         # 시스템 레벨 오버라이드
+})
+
+# 필요 레벨 오름차순으로 정렬해 두고 레벨 경계는 이진 탐색으로 찾음
+_ACTIONS_BY_LEVEL = tuple(sorted(REQUIRED_PERMISSIONS.items(), key=lambda kv: kv[1]))
+_REQUIRED_LEVELS = tuple(level for _, level in _ACTIONS_BY_LEVEL)
+
+@lru_cache(maxsize=8)
+def _actions_for_level(user_level: int) -> Tuple[str, ...]:
+    """권한 레벨에서 수행 가능한 액션 목록"""
+    cutoff = bisect_right(_REQUIRED_LEVELS, user_level)
+    return tuple(action for action, _ in _ACTIONS_BY_LEVEL[:cutoff])
+
+# 병동/대상 직원 검사의 허용 결과 (읽기 전용, 호출마다 새로 만들지 않음)
+_ALLOWED = {
+    reason: MappingProxyType({'allowed': True, 'reason': reason})
+    for reason in (
+        'No ward restriction', 'Admin access', 'Head nurse ward access', 'Same ward access',
+        'Admin privilege', 'Head nurse ward authority', 'Senior nurse authority', 'Self edit'
+    )
+}
+
 class PermissionService:
     """Manual editing 및 Emergency override 권한 관리"""
     
     def __init__(self):
-        # 권한 레벨 정의
-        self.permission_levels = {
-            'admin': 5,           # 시스템 관리자 - 모든 권한
-            'head_nurse': 4,      # 수간호사 - 병동 내 모든 권한
-            'senior_nurse': 3,    # 선임 간호사 - 제한적 편집 권한
-            'staff_nurse': 2,     # 일반 간호사 - 기본 편집 권한
-            'new_nurse': 1        # 신입 간호사 - 읽기 전용
-        }
-        
-        # 기능별 최소 권한 레벨
-        self.required_permissions = {
-            'view_schedule': 1,           # 스케줄 조회
-            'edit_own_requests': 1,       # 본인 근무 희망 편집
-            'basic_schedule_edit': 2,     # 기본 스케줄 편집
-            'shift_swap': 2,             # 근무 교환
-            'emergency_request': 2,       # 응급 상황 요청
-            'approve_swap': 3,           # 근무 교환 승인
-            'manual_override': 3,        # 수동 오버라이드 (제한적)
-            'emergency_override': 4,     # 응급 오버라이드
-            'schedule_publish': 4,       # 스케줄 발행
-            'bulk_edit': 4,              # 대량 편집
-            'system_override': 5         # 시스템 레벨 오버라이드
-        }
+        self.permission_levels = PERMISSION_LEVELS
+        self.required_permissions = REQUIRED_PERMISSIONS
     
     def check_permission(
         self, 
@@ -43,20 +69,40 @@ class PermissionService:
         user_id: int, 
         action: str, 
         ward_id: Optional[int] = None,
-        target_employee_id: Optional[int] = None
+        target_employee_id: Optional[int] = None,
+        cache: Optional[Dict] = None
     ) -> Dict:
-        """권한 검사 수행"""
+        """권한 검사 수행 (cache: 같은 요청 안에서 결과를 재사용할 딕셔너리)"""
+        if cache is None:
+            return self._evaluate_permission(db, user_id, action, ward_id, target_employee_id)
+        
+        key = (user_id, action, ward_id, target_employee_id)
+        result = cache.get(key)
+        if result is None:
+            result = cache[key] = self._evaluate_permission(
+                db, user_id, action, ward_id, target_employee_id
+            )
+        return result
+    
+    def _evaluate_permission(
+        self,
+        db: Session,
+        user_id: int,
+        action: str,
+        ward_id: Optional[int],
+        target_employee_id: Optional[int]
+    ) -> Dict:
+        """권한 검사 본체"""
         try:
-            # 사용자 정보 조회
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user:
+            # 사용자 및 직원 정보 조회
+            user_exists, employee = self._get_user_employee(db, user_id)
+            if not user_exists:
                 return {
                     'allowed': False,
                     'reason': '사용자 정보를 찾을 수 없습니다',
                     'level': 0
                 }
             
-            employee = db.query(Employee).filter(Employee.user_id == user_id).first()
             if not employee:
                 return {
                     'allowed': False,
@@ -103,19 +149,29 @@ class PermissionService:
                 'level': 0
             }
     
-    def _check_ward_permission(self, employee: Employee, ward_id: Optional[int]) -> Dict:
+    def _get_user_employee(self, db: Session, user_id: int) -> Tuple[bool, Optional[Employee]]:
+        """사용자 존재 여부와 직원 정보를 한 번의 JOIN 조회로 확인"""
+        row = db.query(User.id, Employee).outerjoin(
+            Employee, Employee.user_id == User.id
+        ).filter(User.id == user_id).first()
+        
+        if row is None:
+            return False, None
+        return True, row[1]
+    
+    def _check_ward_permission(self, employee: Employee, ward_id: Optional[int]) -> Mapping:
         """병동 권한 검사"""
         if not ward_id:
-            return {'allowed': True, 'reason': 'No ward restriction'}
+            return _ALLOWED['No ward restriction']
         
         # 관리자는 모든 병동 접근 가능
         if employee.role == 'admin':
-            return {'allowed': True, 'reason': 'Admin access'}
+            return _ALLOWED['Admin access']
         
         # 수간호사는 자신의 병동만 관리 가능
         if employee.role == 'head_nurse':
             if employee.ward_id == ward_id:
-                return {'allowed': True, 'reason': 'Head nurse ward access'}
+                return _ALLOWED['Head nurse ward access']
             else:
                 return {
                     'allowed': False, 
@@ -129,14 +185,14 @@ class PermissionService:
                 'reason': '자신의 병동에 대해서만 편집 권한이 있습니다'
             }
         
-        return {'allowed': True, 'reason': 'Same ward access'}
+        return _ALLOWED['Same ward access']
     
     def _check_target_employee_permission(
         self, 
         db: Session, 
         requester: Employee, 
         target_employee_id: int
-    ) -> Dict:
+    ) -> Mapping:
         """대상 직원에 대한 권한 검사"""
         target_employee = db.query(Employee).filter(Employee.id == target_employee_id).first()
         if not target_employee:
@@ -147,12 +203,12 @@ class PermissionService:
         
         # 관리자는 모든 직원 편집 가능
         if requester.role == 'admin':
-            return {'allowed': True, 'reason': 'Admin privilege'}
+            return _ALLOWED['Admin privilege']
         
         # 수간호사는 자신의 병동 직원들 편집 가능
         if requester.role == 'head_nurse':
             if requester.ward_id == target_employee.ward_id:
-                return {'allowed': True, 'reason': 'Head nurse ward authority'}
+                return _ALLOWED['Head nurse ward authority']
             else:
                 return {
                     'allowed': False,
@@ -165,7 +221,7 @@ class PermissionService:
             target_level = self.permission_levels.get(target_employee.role, 0)
             
             if requester_level >= target_level and requester.ward_id == target_employee.ward_id:
-                return {'allowed': True, 'reason': 'Senior nurse authority'}
+                return _ALLOWED['Senior nurse authority']
             else:
                 return {
                     'allowed': False,
@@ -174,7 +230,7 @@ class PermissionService:
         
         # 일반 간호사는 본인만 편집 가능
         if requester.id == target_employee_id:
-            return {'allowed': True, 'reason': 'Self edit'}
+            return _ALLOWED['Self edit']
         else:
             return {
                 'allowed': False,
@@ -184,41 +240,32 @@ class PermissionService:
     def get_available_actions(self, db: Session, user_id: int, ward_id: Optional[int] = None) -> List[str]:
         """사용자에게 허용된 액션 목록 반환"""
         try:
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user:
-                return []
-            
-            employee = db.query(Employee).filter(Employee.user_id == user_id).first()
+            _, employee = self._get_user_employee(db, user_id)
             if not employee:
                 return []
             
-            user_level = self.permission_levels.get(employee.role, 0)
-            available_actions = []
-            
-            for action, required_level in self.required_permissions.items():
-                if user_level >= required_level:
-                    # 병동 권한도 체크
-                    if ward_id:
-                        ward_check = self._check_ward_permission(employee, ward_id)
-                        if ward_check['allowed']:
-                            available_actions.append(action)
-                    else:
-                        available_actions.append(action)
-            
-            return available_actions
+            return self._get_employee_actions(employee, ward_id)
             
         except Exception as e:
             logger.error(f"사용자 액션 목록 조회 중 오류: {str(e)}")
             return []
     
+    def _get_employee_actions(self, employee: Employee, ward_id: Optional[int]) -> List[str]:
+        """조회된 직원 정보로 허용 액션 목록 계산"""
+        # 병동 권한은 모든 액션에 공통이므로 한 번만 확인
+        if ward_id and not self._check_ward_permission(employee, ward_id)['allowed']:
+            return []
+        
+        user_level = self.permission_levels.get(employee.role, 0)
+        return list(_actions_for_level(user_level))
+    
     def create_permission_summary(self, db: Session, user_id: int) -> Dict:
         """사용자 권한 요약 생성"""
         try:
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user:
+            user_exists, employee = self._get_user_employee(db, user_id)
+            if not user_exists:
                 return {'error': '사용자 정보 없음'}
             
-            employee = db.query(Employee).filter(Employee.user_id == user_id).first()
             if not employee:
                 return {'error': '직원 정보 없음'}
             
@@ -229,7 +276,7 @@ class PermissionService:
                 'role': employee.role,
                 'permission_level': user_level,
                 'ward_id': employee.ward_id,
-                'available_actions': self.get_available_actions(db, user_id, employee.ward_id),
+                'available_actions': self._get_employee_actions(employee, employee.ward_id),
                 'permissions': {
                     'can_edit_schedules': user_level >= 2,
                     'can_approve_changes': user_level >= 3,
@@ -244,9 +291,19 @@ class PermissionService:
             logger.error(f"권한 요약 생성 중 오류: {str(e)}")
             return {'error': '권한 요약 생성 실패'}
 
+# 상태를 갖지 않는 서비스이므로 요청마다 생성하지 않고 공유
+_permission_service = PermissionService()
+
 def check_manual_editing_permission(action: str):
     """Manual editing API를 위한 데코레이터"""
     def decorator(func):
+        # 캐시를 받을 수 있는 핸들러에만 전달 (받지 않는 핸들러에 넘기면 TypeError)
+        parameters = inspect.signature(func).parameters
+        accepts_cache = 'permission_cache' in parameters or any(
+            p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters.values()
+        )
+
+        @wraps(func)
         async def wrapper(*args, **kwargs):
             # FastAPI의 Depends를 통해 전달된 user_id와 db 추출
             db = kwargs.get('db')
@@ -259,9 +316,10 @@ def check_manual_editing_permission(action: str):
                     detail="Authentication required"
                 )
             
-            permission_service = PermissionService()
-            permission_result = permission_service.check_permission(
-                db, user_id, action, ward_id
+            # 요청 단위 권한 검사 캐시 (핸들러 안의 추가 검사에서 재사용)
+            permission_cache = {}
+            permission_result = _permission_service.check_permission(
+                db, user_id, action, ward_id, cache=permission_cache
             )
             
             if not permission_result['allowed']:
@@ -272,6 +330,8 @@ def check_manual_editing_permission(action: str):
             
             # 권한 정보를 kwargs에 추가하여 함수에 전달
             kwargs['permission_info'] = permission_result
+            if accepts_cache:
+                kwargs['permission_cache'] = permission_cache
             
             return await func(*args, **kwargs)
         
@@ -3,14 +3,23 @@ Pre-check Service for Schedule Generation
 근무표 생성 전 인원 및 제약조건 검증 서비스
 """
 
+import calendar
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, NamedTuple
+from sqlalchemy import select, func, and_, Row
 from sqlalchemy.orm import Session
 
 from ..models.models import Employee, Ward, ShiftRequest
 from ..models.scheduling_models import Schedule
 
 
+class PreCheckEntry(NamedTuple):
+    """Pre-check 오류/경고 항목"""
+    message: str
+    category: str
+    severity: str
+
+
 class PreCheckResult:
     """Pre-check 결과를 담는 클래스"""
 
@@ -20,23 +29,16 @@ class PreCheckResult:
         self.errors = []
         self.staff_analysis = {}
         self.recommendations = []
+        self._timestamp = None
 
     def add_error(self, message: str, category: str = "general"):
         """심각한 오류 추가 (근무표 생성 차단)"""
         self.is_valid = False
-        self.errors.append({
-            "message": message,
-            "category": category,
-            "severity": "error"
-        })
+        self.errors.append(PreCheckEntry(message, category, "error"))
 
     def add_warning(self, message: str, category: str = "general"):
         """경고 추가 (근무표 생성 가능하지만 주의 필요)"""
-        self.warnings.append({
-            "message": message,
-            "category": category,
-            "severity": "warning"
-        })
+        self.warnings.append(PreCheckEntry(message, category, "warning"))
 
     def add_recommendation(self, message: str):
         """개선 권고사항 추가"""
@@ -44,16 +46,20 @@ class PreCheckResult:
 
     def to_dict(self):
         """결과를 딕셔너리로 변환"""
+        # 여러 번 직렬화해도 같은 시각을 사용
+        if self._timestamp is None:
+            self._timestamp = datetime.utcnow().isoformat()
+
         return {
             "is_valid": self.is_valid,
             "can_generate": self.is_valid,
             "total_errors": len(self.errors),
             "total_warnings": len(self.warnings),
-            "errors": self.errors,
-            "warnings": self.warnings,
+            "errors": [entry._asdict() for entry in self.errors],
+            "warnings": [entry._asdict() for entry in self.warnings],
             "staff_analysis": self.staff_analysis,
             "recommendations": self.recommendations,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": self._timestamp
         }
 
 
@@ -77,24 +83,30 @@ class SchedulePreCheckService:
         """
         result = PreCheckResult()
 
+        # 병동과 활성 직원을 한 번의 조회로 가져옴
+        ward, employees = self._load_ward_with_staff(ward_id)
+
         # 1. 병동 정보 검증
-        ward = self._validate_ward(ward_id, result)
+        ward = self._validate_ward(ward, ward_id, result)
         if not ward:
             return result
 
         # 2. 직원 정보 검증
-        employees = self._validate_staff_availability(ward_id, result)
+        employees = self._validate_staff_availability(employees, result)
         if not employees:
             return result
 
         # 3. 최소 인원 요구사항 검증
         self._check_minimum_staff_requirements(ward, employees, result)
 
+        # 직원 통계는 한 번만 집계해 이후 검증에서 공유
+        staff_stats = self._compute_staff_stats(employees)
+
         # 4. 역할별 인원 분포 검증
-        self._check_role_distribution(employees, result)
+        self._check_role_distribution(staff_stats, result)
 
         # 5. 경험 수준 분포 검증
-        self._check_experience_distribution(employees, result)
+        self._check_experience_distribution(staff_stats, result)
 
         # 6. 해당 기간의 휴가/요청사항 검증
         self._check_leave_requests(ward_id, year, month, employees, result)
@@ -103,14 +115,35 @@ class SchedulePreCheckService:
         self._check_existing_schedules(ward_id, year, month, result)
 
         # 8. 종합 분석 및 권고사항 생성
-        self._generate_recommendations(ward, employees, result)
+        self._generate_recommendations(ward, staff_stats, result)
 
         return result
 
-    def _validate_ward(self, ward_id: int, result: PreCheckResult) -> Optional[Ward]:
-        """병동 정보 검증"""
-        ward = self.db.query(Ward).filter(Ward.id == ward_id).first()
+    def _load_ward_with_staff(self, ward_id: int) -> Tuple[Optional[Ward], List[Row]]:
+        """병동과 검증에 필요한 활성 직원 컬럼을 outer join 한 번으로 조회"""
+        rows = self.db.execute(
+            select(
+                Ward,
+                Employee.id,
+                Employee.employee_number,
+                Employee.role,
+                Employee.skill_level,
+                Employee.years_experience,
+                Employee.employment_type
+            ).outerjoin(
+                Employee,
+                and_(Employee.ward_id == Ward.id, Employee.is_active == True)
+            ).where(Ward.id == ward_id)
+        ).all()
+
+        if not rows:
+            return None, []
+
+        # 활성 직원이 없으면 직원 컬럼이 NULL인 한 행만 반환됨
+        return rows[0].Ward, [row for row in rows if row.id is not None]
 
+    def _validate_ward(self, ward: Optional[Ward], ward_id: int, result: PreCheckResult) -> Optional[Ward]:
+        """병동 정보 검증"""
         if not ward:
             result.add_error(f"병동 ID {ward_id}를 찾을 수 없습니다.", "ward_validation")
             return None
@@ -125,13 +158,8 @@ class SchedulePreCheckService:
 
         return ward
 
-    def _validate_staff_availability(self, ward_id: int, result: PreCheckResult) -> List[Employee]:
+    def _validate_staff_availability(self, employees: List[Row], result: PreCheckResult) -> List[Row]:
         """직원 가용성 검증"""
-        employees = self.db.query(Employee).filter(
-            Employee.ward_id == ward_id,
-            Employee.is_active == True
-        ).all()
-
         if not employees:
             result.add_error(f"병동에 활성화된 직원이 없습니다.", "staff_availability")
             return []
@@ -165,7 +193,7 @@ class SchedulePreCheckService:
 
         return employees
 
-    def _check_minimum_staff_requirements(self, ward: Ward, employees: List[Employee], result: PreCheckResult):
+    def _check_minimum_staff_requirements(self, ward: Ward, employees: List[Row], result: PreCheckResult):
         """최소 인원 요구사항 검증"""
         ward_rules = ward.shift_rules or {}
 
@@ -200,10 +228,12 @@ class SchedulePreCheckService:
             "total_available": total_staff
         }
 
-    def _check_role_distribution(self, employees: List[Employee], result: PreCheckResult):
-        """역할별 인원 분포 검증"""
+    def _compute_staff_stats(self, employees: List[Row]) -> Dict:
+        """역할/숙련도/경력 통계를 한 번의 순회로 집계"""
         role_counts = {}
         skill_counts = {"신입": 0, "중급": 0, "고급": 0}
+        experience_groups = {"0-1년": 0, "2-5년": 0, "6-10년": 0, "10년+": 0}
+        night_capable_count = 0
 
         for emp in employees:
             # 역할별 카운트
@@ -215,6 +245,35 @@ class SchedulePreCheckService:
             if skill in skill_counts:
                 skill_counts[skill] += 1
 
+            # 경력별 카운트
+            years = emp.years_experience or 0
+            if years <= 1:
+                experience_groups["0-1년"] += 1
+            elif years <= 5:
+                experience_groups["2-5년"] += 1
+            elif years <= 10:
+                experience_groups["6-10년"] += 1
+            else:
+                experience_groups["10년+"] += 1
+
+            # 야간 근무 가능 인력 (2년 이상 경력)
+            if years >= 2:
+                night_capable_count += 1
+
+        return {
+            "total_count": len(employees),
+            "role_counts": role_counts,
+            "skill_counts": skill_counts,
+            "experience_groups": experience_groups,
+            "new_nurse_count": skill_counts["신입"],
+            "night_capable_count": night_capable_count
+        }
+
+    def _check_role_distribution(self, staff_stats: Dict, result: PreCheckResult):
+        """역할별 인원 분포 검증"""
+        role_counts = staff_stats["role_counts"]
+        skill_counts = staff_stats["skill_counts"]
+
         # 수간호사 검증
         if role_counts.get("수간호사", 0) == 0:
             result.add_warning("수간호사가 배정되지 않았습니다.", "role_distribution")
@@ -222,8 +281,8 @@ class SchedulePreCheckService:
             result.add_warning(f"수간호사가 {role_counts['수간호사']}명 배정되었습니다. 일반적으로 1명이 적절합니다.", "role_distribution")
 
         # 신입간호사 비율 검증
-        total_nurses = len(employees)
-        new_nurses = skill_counts["신입"]
+        total_nurses = staff_stats["total_count"]
+        new_nurses = staff_stats["new_nurse_count"]
         if new_nurses / total_nurses > 0.3:  # 30% 이상
             result.add_warning(
                 f"신입간호사 비율이 {new_nurses/total_nurses*100:.1f}%로 높습니다. "
@@ -239,22 +298,11 @@ class SchedulePreCheckService:
             "new_nurse_ratio": new_nurses / total_nurses if total_nurses > 0 else 0
         }
 
-    def _check_experience_distribution(self, employees: List[Employee], result: PreCheckResult):
+    def _check_experience_distribution(self, staff_stats: Dict, result: PreCheckResult):
         """경험 수준 분포 검증"""
-        experience_groups = {"0-1년": 0, "2-5년": 0, "6-10년": 0, "10년+": 0}
+        experience_groups = staff_stats["experience_groups"]
 
-        for emp in employees:
-            years = emp.years_experience or 0
-            if years <= 1:
-                experience_groups["0-1년"] += 1
-            elif years <= 5:
-                experience_groups["2-5년"] += 1
-            elif years <= 10:
-                experience_groups["6-10년"] += 1
-            else:
-                experience_groups["10년+"] += 1
-
-        total = len(employees)
+        total = staff_stats["total_count"]
         senior_nurses = experience_groups["6-10년"] + experience_groups["10년+"]
 
         if senior_nurses / total < 0.3:  # 30% 미만
@@ -266,40 +314,42 @@ class SchedulePreCheckService:
 
         result.staff_analysis["experience_distribution"] = experience_groups
 
-    def _check_leave_requests(self, ward_id: int, year: int, month: int, employees: List[Employee], result: PreCheckResult):
+    def _check_leave_requests(self, ward_id: int, year: int, month: int, employees: List[Row], result: PreCheckResult):
         """휴가 및 근무 요청사항 검증"""
         # 해당 월의 시작일과 종료일 계산
+        days_in_month = calendar.monthrange(year, month)[1]
         start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
-        else:
-            end_date = datetime(year, month + 1, 1)
-
-        days_in_month = (end_date - start_date).days
-
-        # 승인된 휴가/근무 요청 조회
-        shift_requests = self.db.query(ShiftRequest).filter(
-            ShiftRequest.employee_id.in_([emp.id for emp in employees]),
-            ShiftRequest.request_date >= start_date,
-            ShiftRequest.request_date < end_date,
-            ShiftRequest.status == "approved"
+        end_date = start_date + timedelta(days=days_in_month)
+
+        # 승인된 휴가/근무 요청을 직원/유형별 건수로 집계
+        request_counts = self.db.execute(
+            select(
+                ShiftRequest.employee_id,
+                ShiftRequest.request_type,
+                func.count()
+            ).where(
+                ShiftRequest.employee_id.in_([emp.id for emp in employees]),
+                ShiftRequest.request_date >= start_date,
+                ShiftRequest.request_date < end_date,
+                ShiftRequest.status == "approved"
+            ).group_by(ShiftRequest.employee_id, ShiftRequest.request_type)
         ).all()
 
         leave_counts = {}
         work_requests = {}
 
-        for req in shift_requests:
-            emp_id = req.employee_id
-            if req.request_type == "leave":
-                leave_counts[emp_id] = leave_counts.get(emp_id, 0) + 1
+        for emp_id, request_type, count in request_counts:
+            if request_type == "leave":
+                leave_counts[emp_id] = leave_counts.get(emp_id, 0) + count
             else:
-                work_requests[emp_id] = work_requests.get(emp_id, 0) + 1
+                work_requests[emp_id] = work_requests.get(emp_id, 0) + count
 
         # 과도한 휴가 요청 검증
+        emp_by_id = {e.id: e for e in employees}
         excessive_leave = []
         for emp_id, leave_days in leave_counts.items():
             if leave_days > days_in_month * 0.3:  # 월의 30% 이상
-                emp = next((e for e in employees if e.id == emp_id), None)
+                emp = emp_by_id.get(emp_id)
                 if emp:
                     excessive_leave.append(f"{emp.employee_number} ({leave_days}일)")
 
@@ -356,21 +406,21 @@ class SchedulePreCheckService:
                     "schedule_conflict"
                 )
 
-    def _generate_recommendations(self, ward: Ward, employees: List[Employee], result: PreCheckResult):
+    def _generate_recommendations(self, ward: Ward, staff_stats: Dict, result: PreCheckResult):
         """종합 분석 및 권고사항 생성"""
-        total_staff = len(employees)
+        total_staff = staff_stats["total_count"]
 
         # 인력 충원 권고
         if total_staff < 8:
             result.add_recommendation(f"안정적인 근무표 운영을 위해 최소 8명 이상의 인력 충원을 권장합니다. (현재: {total_staff}명)")
 
         # 신입간호사 교육 권고
-        new_nurses = sum(1 for emp in employees if (emp.skill_level or "신입") == "신입")
+        new_nurses = staff_stats["new_nurse_count"]
         if new_nurses > total_staff * 0.3:
             result.add_recommendation("신입간호사 비율이 높습니다. 충분한 교육과 멘토링 시스템 구축을 권장합니다.")
 
         # 야간 근무 전담 인력 권고
-        night_capable = sum(1 for emp in employees if (emp.years_experience or 0) >= 2)
+        night_capable = staff_stats["night_capable_count"]
         if night_capable < 4:
             result.add_recommendation("야간 근무 가능 인력이 부족합니다. 2년 이상 경력자 충원을 권장합니다.")
 
@@ -2,19 +2,22 @@
 개인 선호도 및 요청 관리 서비스
 """
 from typing import List, Dict, Any, Tuple, Optional
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from datetime import datetime
+from sqlalchemy import select, Row
+from sqlalchemy.orm import Session, joinedload, load_only
 from app.models.models import (
     PreferenceTemplate, ShiftRequestV2, PreferenceScore, 
     Employee, User
 )
 from app.models.scheduling_models import Schedule
 import json
-from collections import defaultdict
+from collections import Counter, defaultdict
 
 class PreferenceService:
     def __init__(self, db: Session):
         self.db = db
+        # 요청 단위 선호도 캐시 (조회 결과가 없으면 None 저장)
+        self._pref_cache: Dict[int, Optional[PreferenceTemplate]] = {}
     
     def create_preference_template(self, employee_id: int, preferences: Dict) -> PreferenceTemplate:
         """간호사의 선호도 템플릿 생성"""
@@ -43,6 +46,7 @@ class PreferenceService:
         )
         
         self.db.add(new_template)
+        self._pref_cache.pop(employee_id, None)
         self.db.commit()
         self.db.refresh(new_template)
         return new_template
@@ -90,10 +94,16 @@ class PreferenceService:
     
     def get_employee_preferences(self, employee_id: int) -> Optional[PreferenceTemplate]:
         """간호사 선호도 조회"""
-        return self.db.query(PreferenceTemplate).filter(
+        if employee_id in self._pref_cache:
+            return self._pref_cache[employee_id]
+        
+        # 활성 템플릿이 여럿이면 가장 최근 것을 사용 (_bulk_load_preferences와 동일 규칙)
+        preferences = self.db.query(PreferenceTemplate).filter(
             PreferenceTemplate.employee_id == employee_id,
             PreferenceTemplate.is_active == True
-        ).first()
+        ).order_by(PreferenceTemplate.id.desc()).first()
+        self._pref_cache[employee_id] = preferences
+        return preferences
     
     def get_pending_requests(self, ward_id: Optional[int] = None) -> List[ShiftRequestV2]:
         """대기 중인 요청 조회"""
@@ -109,7 +119,37 @@ class PreferenceService:
     def calculate_preference_score(self, employee_id: int, 
                                   schedule_data: Dict, schedule_id: int) -> PreferenceScore:
         """개별 간호사의 선호도 점수 계산"""
+        schedule_start = self.db.query(Schedule.period_start).filter(
+            Schedule.id == schedule_id
+        ).scalar()
+        if schedule_start is None:
+            raise ValueError("스케줄을 찾을 수 없습니다")
+        
         preferences = self.get_employee_preferences(employee_id)
+        requests = self._bulk_load_requests([employee_id]).get(employee_id, {})
+        
+        score_obj = self._build_preference_score(
+            employee_id, schedule_data, schedule_id, schedule_start, preferences, requests
+        )
+        # 기본 점수는 저장하지 않음
+        if preferences and schedule_data.get(str(employee_id)):
+            self.persist_preference_scores([score_obj])
+        return score_obj
+    
+    def persist_preference_scores(self, scores: List[PreferenceScore]) -> None:
+        """계산된 선호도 점수를 한 번의 커밋으로 저장"""
+        if not scores:
+            return
+        
+        self.db.add_all(scores)
+        self.db.commit()
+    
+    def _build_preference_score(self, employee_id: int, schedule_data: Dict, schedule_id: int,
+                                schedule_start: datetime,
+                                preferences: Optional[PreferenceTemplate],
+                                requests: Dict[str, List[Row]],
+                                stats: Optional[Dict[str, int]] = None) -> PreferenceScore:
+        """미리 조회한 선호도/요청으로 점수 객체 생성 (DB 접근 없음)"""
         if not preferences:
             return self._create_default_score(employee_id, schedule_id)
         
@@ -117,25 +157,31 @@ class PreferenceService:
         if not employee_shifts:
             return self._create_default_score(employee_id, schedule_id)
         
+        # 월별 통계 (야간/주말 횟수는 공정성 점수에서도 재사용)
+        if stats is None:
+            stats = self._calculate_monthly_stats(employee_shifts)
+        
         # 각 점수 계산
         shift_score = self._calculate_shift_preference_score(employee_shifts, preferences)
         pattern_score = self._calculate_pattern_preference_score(employee_shifts, preferences)
-        workload_score = self._calculate_workload_fairness_score(employee_shifts, preferences)
+        workload_score = self._calculate_workload_fairness_score(
+            stats["night_shifts"], stats["weekend_shifts"], preferences
+        )
         
         # 요청 충족률 계산
-        vacation_rate = self._calculate_vacation_fulfillment_rate(employee_id, schedule_data)
-        request_rate = self._calculate_request_fulfillment_rate(employee_id, schedule_data)
-        
-        # 월별 통계
-        stats = self._calculate_monthly_stats(employee_shifts)
+        vacation_rate = self._calculate_vacation_fulfillment_rate(
+            employee_shifts, requests.get("vacation", []), schedule_start
+        )
+        request_rate = self._calculate_request_fulfillment_rate(
+            requests.get("shift_preference", [])
+        )
         
         # 전체 점수 계산
         total_score = (shift_score * 0.3 + pattern_score * 0.2 + 
                       workload_score * 0.2 + vacation_rate * 0.15 + 
                       request_rate * 0.15)
         
-        # PreferenceScore 객체 생성
-        score_obj = PreferenceScore(
+        return PreferenceScore(
             employee_id=employee_id,
             schedule_id=schedule_id,
             total_preference_score=total_score,
@@ -148,11 +194,49 @@ class PreferenceService:
             weekend_shifts_assigned=stats["weekend_shifts"],
             total_hours_assigned=stats["total_hours"]
         )
+    
+    def _bulk_load_requests(self, employee_ids: List[int]) -> Dict[int, Dict[str, List[Row]]]:
+        """승인된 근무 요청을 한 번에 조회해 직원/요청 유형별로 분류"""
+        grouped: Dict[int, Dict[str, List[Row]]] = defaultdict(lambda: defaultdict(list))
+        if not employee_ids:
+            return grouped
+        
+        # 충족률 계산에 필요한 컬럼만 조회 (ix_shift_req_v2_emp_status_type 사용)
+        requests = self.db.execute(
+            select(
+                ShiftRequestV2.employee_id,
+                ShiftRequestV2.request_type,
+                ShiftRequestV2.start_date,
+                ShiftRequestV2.end_date,
+                ShiftRequestV2.status
+            ).where(
+                ShiftRequestV2.employee_id.in_(employee_ids),
+                ShiftRequestV2.status.in_(["approved", "partially_approved"])
+            )
+        ).all()
         
-        self.db.add(score_obj)
-        self.db.commit()
-        self.db.refresh(score_obj)
-        return score_obj
+        for request in requests:
+            grouped[request.employee_id][request.request_type].append(request)
+        return grouped
+    
+    def _bulk_load_preferences(self, employee_ids: List[int]) -> Dict[int, PreferenceTemplate]:
+        """활성 선호도 템플릿을 한 번에 조회"""
+        missing_ids = [emp_id for emp_id in employee_ids if emp_id not in self._pref_cache]
+        if missing_ids:
+            templates = self.db.query(PreferenceTemplate).filter(
+                PreferenceTemplate.employee_id.in_(missing_ids),
+                PreferenceTemplate.is_active == True
+            ).order_by(PreferenceTemplate.id.desc()).all()
+            
+            # get_employee_preferences와 같은 규칙: 직원별 가장 최근 템플릿
+            latest: Dict[int, PreferenceTemplate] = {}
+            for template in templates:
+                latest.setdefault(template.employee_id, template)
+            for emp_id in missing_ids:
+                self._pref_cache[emp_id] = latest.get(emp_id)
+        
+        return {emp_id: self._pref_cache[emp_id] for emp_id in employee_ids
+                if self._pref_cache[emp_id] is not None}
     
     def _calculate_shift_preference_score(self, shifts: List[str], 
                                         preferences: PreferenceTemplate) -> float:
@@ -160,31 +244,32 @@ class PreferenceService:
         if not shifts:
             return 0.0
         
-        preferred = preferences.preferred_shifts or []
-        avoided = preferences.avoided_shifts or []
+        preferred = frozenset(preferences.preferred_shifts or ())
+        avoided = frozenset(preferences.avoided_shifts or ())
         
-        score = 0.0
-        total_shifts = len([s for s in shifts if s != "off"])
+        # 근무 유형별 횟수로 한 번에 계산
+        shift_counts = Counter(shifts)
+        shift_counts.pop("off", None)
+        total_shifts = sum(shift_counts.values())
         
         if total_shifts == 0:
             return 100.0
         
-        for shift in shifts:
-            if shift == "off":
-                continue
+        score = 0.0
+        for shift, count in shift_counts.items():
             if shift in preferred:
-                score += 2.0
+                score += 2.0 * count
             elif shift in avoided:
-                score -= 1.0
+                score -= 1.0 * count
             else:
-                score += 1.0
+                score += 1.0 * count
         
         # 0-100 범위로 정규화
         max_possible = total_shifts * 2.0
         min_possible = total_shifts * -1.0
         normalized = ((score - min_possible) / (max_possible - min_possible)) * 100
         
-        return max(0.0, min(100.0, normalized))
+        return 0.0 if normalized < 0.0 else 100.0 if normalized > 100.0 else normalized
     
     def _calculate_pattern_preference_score(self, shifts: List[str], 
                                           preferences: PreferenceTemplate) -> float:
@@ -192,25 +277,23 @@ class PreferenceService:
         if len(shifts) < 2:
             return 100.0
         
-        preferred_patterns = preferences.preferred_patterns or []
-        avoided_patterns = preferences.avoided_patterns or []
+        preferred_patterns = frozenset(preferences.preferred_patterns or ())
+        avoided_patterns = frozenset(preferences.avoided_patterns or ())
         
-        score = 0.0
-        pattern_count = 0
+        # 인접 근무쌍을 먼저 집계해 서로 다른 패턴마다 한 번만 문자열 비교
+        pair_counts = Counter(zip(shifts, shifts[1:]))
+        pattern_count = len(shifts) - 1
         
-        for i in range(len(shifts) - 1):
-            current = shifts[i]
-            next_shift = shifts[i + 1]
+        score = 0.0
+        for (current, next_shift), count in pair_counts.items():
             pattern = f"{current}->{next_shift}"
             
-            pattern_count += 1
-            
             if pattern in preferred_patterns:
-                score += 2.0
+                score += 2.0 * count
             elif pattern in avoided_patterns:
-                score -= 2.0
+                score -= 2.0 * count
             else:
-                score += 1.0
+                score += 1.0 * count
         
         if pattern_count == 0:
             return 100.0
@@ -220,14 +303,11 @@ class PreferenceService:
         min_possible = pattern_count * -2.0
         normalized = ((score - min_possible) / (max_possible - min_possible)) * 100
         
-        return max(0.0, min(100.0, normalized))
+        return 0.0 if normalized < 0.0 else 100.0 if normalized > 100.0 else normalized
     
-    def _calculate_workload_fairness_score(self, shifts: List[str], 
+    def _calculate_workload_fairness_score(self, night_count: int, weekend_count: int,
                                          preferences: PreferenceTemplate) -> float:
         """근무량 공정성 점수 계산"""
-        night_count = shifts.count("night")
-        weekend_count = self._count_weekend_shifts(shifts)
-        
         # 선호 최대치와 비교
         max_nights = preferences.max_night_shifts_per_month
         max_weekends = preferences.max_weekend_shifts_per_month
@@ -239,63 +319,44 @@ class PreferenceService:
     
     def _count_weekend_shifts(self, shifts: List[str]) -> int:
         """주말 근무 횟수 계산 (토요일=5, 일요일=6)"""
-        weekend_count = 0
-        for i, shift in enumerate(shifts):
-            if shift != "off":
-                day_of_week = i % 7
-                if day_of_week in [5, 6]:  # 토, 일
-                    weekend_count += 1
-        return weekend_count
+        # 토/일 위치만 슬라이스해서 휴무를 제외
+        saturdays = shifts[5::7]
+        sundays = shifts[6::7]
+        return (len(saturdays) - saturdays.count("off")) + (len(sundays) - sundays.count("off"))
     
-    def _calculate_vacation_fulfillment_rate(self, employee_id: int, 
-                                           schedule_data: Dict) -> float:
+    def _calculate_vacation_fulfillment_rate(self, employee_shifts: List[str], 
+                                           vacation_requests: List[Row],
+                                           schedule_start: datetime) -> float:
         """휴가 요청 충족률 계산"""
-        # 해당 기간의 휴가 요청 조회
-        vacation_requests = self.db.query(ShiftRequestV2).filter(
-            ShiftRequestV2.employee_id == employee_id,
-            ShiftRequestV2.request_type == "vacation",
-            ShiftRequestV2.status.in_(["approved", "partially_approved"])
-        ).all()
-        
         if not vacation_requests:
             return 100.0
         
         fulfilled_days = 0
         total_requested_days = 0
         
+        schedule_start = schedule_start.date()
         for request in vacation_requests:
             days_diff = (request.end_date - request.start_date).days + 1
             total_requested_days += days_diff
             
-            # 스케줄에서 실제 휴가가 반영된 날짜 수 계산
-            employee_shifts = schedule_data.get(str(employee_id), [])
-            for day_idx in range(len(employee_shifts)):
-                schedule_date = request.start_date + timedelta(days=day_idx)
-                if (schedule_date >= request.start_date and 
-                    schedule_date <= request.end_date and 
-                    day_idx < len(employee_shifts) and
-                    employee_shifts[day_idx] == "off"):
-                    fulfilled_days += 1
+            # 요청 기간을 스케줄 인덱스 구간으로 바꿔 휴무 수만 센다
+            start_idx = max(0, (request.start_date.date() - schedule_start).days)
+            end_idx = min(len(employee_shifts), (request.end_date.date() - schedule_start).days + 1)
+            if start_idx < end_idx:
+                fulfilled_days += employee_shifts[start_idx:end_idx].count("off")
         
         if total_requested_days == 0:
             return 100.0
         
         return (fulfilled_days / total_requested_days) * 100
     
-    def _calculate_request_fulfillment_rate(self, employee_id: int, 
-                                          schedule_data: Dict) -> float:
+    def _calculate_request_fulfillment_rate(self, shift_requests: List[Row]) -> float:
         """일반 근무 요청 충족률 계산"""
-        shift_requests = self.db.query(ShiftRequestV2).filter(
-            ShiftRequestV2.employee_id == employee_id,
-            ShiftRequestV2.request_type == "shift_preference",
-            ShiftRequestV2.status.in_(["approved", "partially_approved"])
-        ).all()
-        
         if not shift_requests:
             return 100.0
         
         # 간단한 충족률 계산 (실제로는 더 복잡한 로직 필요)
-        approved_requests = len([r for r in shift_requests if r.status == "approved"])
+        approved_requests = sum(1 for r in shift_requests if r.status == "approved")
         total_requests = len(shift_requests)
         
         return (approved_requests / total_requests) * 100 if total_requests > 0 else 100.0
@@ -305,7 +366,7 @@ class PreferenceService:
         return {
             "night_shifts": shifts.count("night"),
             "weekend_shifts": self._count_weekend_shifts(shifts),
-            "total_hours": len([s for s in shifts if s != "off"]) * 8  # 8시간 근무 가정
+            "total_hours": sum(1 for s in shifts if s != "off") * 8  # 8시간 근무 가정
         }
     
     def _create_default_score(self, employee_id: int, schedule_id: int) -> PreferenceScore:
@@ -324,7 +385,11 @@ class PreferenceService:
     def get_fairness_analysis(self, schedule: Schedule) -> Dict[str, Any]:
         """공정성 분석 리포트 생성"""
         schedule_data = schedule.schedule_data
-        employees = self.db.query(Employee).filter(
+        # 이름 조회용 사용자 정보를 함께 로드해 직원별 지연 로딩을 피함
+        employees = self.db.query(Employee).options(
+            load_only(Employee.id),
+            joinedload(Employee.user).load_only(User.full_name)
+        ).filter(
             Employee.ward_id == schedule.ward_id,
             Employee.is_active == True
         ).all()
@@ -340,15 +405,26 @@ class PreferenceService:
         
         total_fairness = 0.0
         
+        # 선호도/요청을 직원 수와 무관하게 한 번씩만 조회
+        employee_ids = [employee.id for employee in employees]
+        preferences_by_emp = self._bulk_load_preferences(employee_ids)
+        requests_by_emp = self._bulk_load_requests(employee_ids)
+        scores_to_save = []
+        
         for employee in employees:
             emp_shifts = schedule_data.get(str(employee.id), [])
-            night_count = emp_shifts.count("night")
-            weekend_count = self._count_weekend_shifts(emp_shifts)
+            stats = self._calculate_monthly_stats(emp_shifts)
+            night_count = stats["night_shifts"]
+            weekend_count = stats["weekend_shifts"]
             
             # 선호도 점수 계산
-            preference_score = self.calculate_preference_score(
-                employee.id, schedule_data, schedule.id
+            preferences = preferences_by_emp.get(employee.id)
+            preference_score = self._build_preference_score(
+                employee.id, schedule_data, schedule.id, schedule.period_start,
+                preferences, requests_by_emp.get(employee.id, {}), stats
             )
+            if preferences and emp_shifts:
+                scores_to_save.append(preference_score)
             
             analysis["fairness_scores"].append({
                 "employee_id": employee.id,
@@ -364,6 +440,9 @@ class PreferenceService:
             
             total_fairness += preference_score.total_preference_score
         
+        # 점수 저장은 마지막에 한 번만 커밋
+        self.persist_preference_scores(scores_to_save)
+        
         analysis["overall_fairness_score"] = total_fairness / len(employees) if employees else 0.0
         
         return analysis
@@ -3,7 +3,7 @@
 """
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from app.models.models import (
     Employee, RoleConstraint, SupervisionPair, EmploymentTypeRule, 
     RoleViolation, Ward
@@ -24,6 +24,30 @@ class RoleAssignmentService:
             "new_nurse": 1,       # 신입간호사
             "education_coordinator": 4  # 교육담당
         }
+        
+        # 검증 중 재사용할 직원 캐시 (직원 ID -> Employee)
+        self._emp_cache: Dict[int, Employee] = {}
+        
+        # 검증 1회 동안 재사용할 제약조건/고용형태 규칙
+        self._role_constraints: List[RoleConstraint] = []
+        self._emp_rules: Dict[str, EmploymentTypeRule] = {}
+        self._supervision_by_supervisee: Dict[int, SupervisionPair] = {}
+    
+    def _preload_employees(self, schedule_data: Dict) -> None:
+        """스케줄에 포함된 직원을 사용자 정보와 함께 한 번에 조회"""
+        missing_ids = [
+            int(emp_id_str) for emp_id_str in schedule_data.keys()
+            if int(emp_id_str) not in self._emp_cache
+        ]
+        if not missing_ids:
+            return
+        
+        employees = self.db.query(Employee).options(
+            joinedload(Employee.user)
+        ).filter(Employee.id.in_(missing_ids)).all()
+        
+        for employee in employees:
+            self._emp_cache[employee.id] = employee
     
     def validate_role_assignments(self, schedule: Schedule) -> Tuple[bool, List[Dict]]:
         """스케줄의 역할별 배치 규칙 검증"""
@@ -36,16 +60,61 @@ class RoleAssignmentService:
         
         days_count = len(next(iter(schedule_data.values()), []))
         
-        for day_idx in range(days_count):
-            for shift_type in ["day", "evening", "night"]:
-                day_violations = self._validate_day_shift_assignments(
-                    schedule, day_idx, shift_type
-                )
-                violations.extend(day_violations)
+        try:
+            # 날짜/근무마다 직원을 조회하지 않도록 미리 로드
+            self._preload_employees(schedule_data)
+            self._load_validation_rules(schedule.ward_id)
+            self._load_supervision_pairs()
+            
+            for day_idx in range(days_count):
+                for shift_type in ["day", "evening", "night"]:
+                    day_violations = self._validate_day_shift_assignments(
+                        schedule, day_idx, shift_type
+                    )
+                    violations.extend(day_violations)
+        finally:
+            # 캐시는 검증 1회 동안만 유효 (직원 역할/상태 변경이 다음 검증에 반영되도록)
+            self._emp_cache = {}
+            self._role_constraints = []
+            self._emp_rules = {}
+            self._supervision_by_supervisee = {}
         
         is_valid = len(violations) == 0
         return is_valid, violations
     
+    def _load_validation_rules(self, ward_id: int) -> None:
+        """병동 역할 제약조건과 고용형태 규칙을 검증 시작 시 한 번만 조회"""
+        self._role_constraints = self.db.query(RoleConstraint).filter(
+            ((RoleConstraint.ward_id == ward_id) | (RoleConstraint.ward_id.is_(None))),
+            RoleConstraint.is_active == True
+        ).all()
+        
+        rules = self.db.query(EmploymentTypeRule).filter(
+            EmploymentTypeRule.is_active == True
+        ).order_by(EmploymentTypeRule.id).all()
+        
+        self._emp_rules = {}
+        for rule in rules:
+            self._emp_rules.setdefault(rule.employment_type, rule)
+    
+    def _load_supervision_pairs(self) -> None:
+        """스케줄에 포함된 신입간호사들의 활성 감독 페어를 한 번에 조회"""
+        new_nurse_ids = [
+            employee.id for employee in self._emp_cache.values()
+            if employee.role == "new_nurse"
+        ]
+        self._supervision_by_supervisee = {}
+        if not new_nurse_ids:
+            return
+        
+        pairs = self.db.query(SupervisionPair).filter(
+            SupervisionPair.is_active == True,
+            SupervisionPair.supervisee_id.in_(new_nurse_ids)
+        ).order_by(SupervisionPair.id).all()
+        
+        for pair in pairs:
+            self._supervision_by_supervisee.setdefault(pair.supervisee_id, pair)
+    
     def _validate_day_shift_assignments(self, schedule: Schedule, 
                                       day_idx: int, shift_type: str) -> List[Dict]:
         """특정 날짜/근무의 역할 배치 검증"""
@@ -58,9 +127,7 @@ class RoleAssignmentService:
         
         for emp_id_str, shifts in schedule_data.items():
             if day_idx < len(shifts) and shifts[day_idx] == shift_type:
-                employee = self.db.query(Employee).filter(
-                    Employee.id == int(emp_id_str)
-                ).first()
+                employee = self._emp_cache.get(int(emp_id_str))
                 if employee:
                     assigned_employees.append(employee)
                     employees_by_role[employee.role].append(employee)
@@ -75,7 +142,7 @@ class RoleAssignmentService:
         
         # 2. 역할별 최소/최대 인원 검증
         violations.extend(self._check_role_staffing_requirements(
-            employees_by_role, schedule.ward_id, day_idx, shift_type
+            employees_by_role, day_idx, shift_type
         ))
         
         # 3. 고용형태별 제약조건 검증
@@ -110,10 +177,7 @@ class RoleAssignmentService:
         for new_nurse in new_nurses:
             if new_nurse.requires_supervision:
                 # 전담 감독자 확인
-                supervision_pair = self.db.query(SupervisionPair).filter(
-                    SupervisionPair.supervisee_id == new_nurse.id,
-                    SupervisionPair.is_active == True
-                ).first()
+                supervision_pair = self._supervision_by_supervisee.get(new_nurse.id)
                 
                 if supervision_pair:
                     # 전담 감독자가 같은 근무에 있는지 확인
@@ -148,18 +212,12 @@ class RoleAssignmentService:
         return violations
     
     def _check_role_staffing_requirements(self, employees_by_role: Dict, 
-                                        ward_id: int, day_idx: int, 
-                                        shift_type: str) -> List[Dict]:
+                                        day_idx: int, shift_type: str) -> List[Dict]:
         """역할별 최소/최대 인원 요구사항 검증"""
         violations = []
         
-        # 병동의 역할별 제약조건 조회
-        role_constraints = self.db.query(RoleConstraint).filter(
-            ((RoleConstraint.ward_id == ward_id) | (RoleConstraint.ward_id.is_(None))),
-            RoleConstraint.is_active == True
-        ).all()
-        
-        for constraint in role_constraints:
+        # 검증 시작 시 조회한 병동의 역할별 제약조건 사용
+        for constraint in self._role_constraints:
             if shift_type not in (constraint.allowed_shifts or ["day", "evening", "night"]):
                 continue
             
@@ -202,10 +260,7 @@ class RoleAssignmentService:
         
         for employee in assigned_employees:
             # 고용형태별 규칙 조회
-            emp_rule = self.db.query(EmploymentTypeRule).filter(
-                EmploymentTypeRule.employment_type == employee.employment_type,
-                EmploymentTypeRule.is_active == True
-            ).first()
+            emp_rule = self._emp_rules.get(employee.employment_type)
             
             if not emp_rule:
                 continue
@@ -474,10 +529,9 @@ class RoleAssignmentService:
         }
         
         # 직원별 역할 및 고용형태 분포
+        self._preload_employees(schedule_data)
         for emp_id_str in schedule_data.keys():
-            employee = self.db.query(Employee).filter(
-                Employee.id == int(emp_id_str)
-            ).first()
+            employee = self._emp_cache.get(int(emp_id_str))
             if employee:
                 summary["role_distribution"][employee.role] += 1
                 summary["employment_type_distribution"][employee.employment_type] += 1
@@ -728,16 +728,23 @@ class ScoreBreakdownService:
         """점수 분석 통계 계산"""
         scores = [analysis["raw_score"] for analysis in category_scores.values()]
 
+        # 점수 구간별 분포 (한 번의 순회로 집계)
+        distribution = {"excellent": 0, "good": 0, "fair": 0, "poor": 0}
+        for s in scores:
+            if s >= 90:
+                distribution["excellent"] += 1
+            elif s >= 70:
+                distribution["good"] += 1
+            elif s >= 50:
+                distribution["fair"] += 1
+            else:
+                distribution["poor"] += 1
+
         return {
             "highest_score_category": max(category_scores.items(), key=lambda x: x[1]["raw_score"])[1]["category"],
             "lowest_score_category": min(category_scores.items(), key=lambda x: x[1]["raw_score"])[1]["category"],
             "average_score": sum(scores) / len(scores) if scores else 0,
-            "score_distribution": {
-                "excellent": len([s for s in scores if s >= 90]),
-                "good": len([s for s in scores if 70 <= s < 90]),
-                "fair": len([s for s in scores if 50 <= s < 70]),
-                "poor": len([s for s in scores if s < 50])
-            }
+            "score_distribution": distribution
         }
 
     def _initialize_score_explanations(self) -> Dict[str, str]: